@@ -0,0 +1,156 @@
+"""
+Browser jobs run by the browser worker processes (see `src.adam.browser_worker_service`).
+
+This module deliberately doesn't import CrewAI (or anything from the agent), since every worker process
+imports it to unpickle its jobs.
+"""
+
+import re
+from time import sleep
+from typing import Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service as ChromeService
+import seleniumwire.webdriver
+from seleniumwire.webdriver import ChromeOptions
+
+from src.adam.network_artifacts import (
+    NetworkArtifactWriter,
+    format_har_entries,
+    har_entry_from_request,
+)
+
+
+def run_js_code_job(web_page: str, sleep_time: int, js_code: str) -> str:
+    """
+    Loads the web page in a headless Chrome browser and runs the JS code on it. It runs inside a
+    browser worker process, never in the agent process.
+
+    Args:
+        web_page (str): A complete URL of the web page where we need to run the JS code.
+        sleep_time (int): Number of seconds to wait after loading the web page and before executing the JS code.
+        js_code (str): The JS code to run/execute on the web page.
+
+    Returns:
+        str: The tool output, specifying the JS code output or the encountered exception.
+    """
+    options = Options()
+
+    # Run in headless mode (no GUI)
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    driver = webdriver.Chrome(
+        service=ChromeService("/usr/bin/chromedriver"), options=options
+    )
+
+    driver.execute_cdp_cmd(
+        "Page.addScriptToEvaluateOnNewDocument",
+        {
+            "source": """
+            Object.defineProperty(navigator, 'webdriver', {get: () => undefined})
+        """
+        },
+    )
+    driver.set_page_load_timeout(60)
+
+    try:
+        driver.get(web_page)
+        sleep(sleep_time)
+        return f"Congratulations! The tool ran successfully.\n\nHere is the JS code output:\n{driver.execute_script(js_code)}"
+    except Exception as e:
+        return f"An exception occurred while using the tool!\nHere it is. {e}\n\nStop here and respond with the exception summary."
+    finally:
+        driver.quit()
+
+
+def fetch_network_requests_job(
+    web_page: str,
+    sleep_time: int,
+    regex_filter_string: str,
+    artifact_path: Optional[str] = None,
+) -> str:
+    """
+    Loads the web page in a headless Chrome browser (via Selenium Wire) and collects the network requests
+    matching the regex filter. It runs inside a browser worker process,
+    never in the agent process.
+
+    Args:
+        web_page (str): A complete URL of the web page where we need to fetch/get the network/HTTP requests from.
+        sleep_time (int): Number of seconds to wait after loading the web page and before fetching/getting the network requests.
+        regex_filter_string (str): A regex filter string to filter only the requests to a specific URL.
+        artifact_path (Optional[str]): If passed, all the requests (unfiltered) are recorded in a network artifact at this path (see `src.adam.network_artifacts`).
+            It's generated by the caller, so that it's known even if the job gets killed.
+
+    Returns:
+        str: The tool output, specifying the filtered requests or the encountered exception.
+    """
+    options = ChromeOptions()
+
+    # Run in headless mode (no GUI)
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    driver = seleniumwire.webdriver.Chrome(
+        service=ChromeService("/usr/bin/chromedriver"), options=options
+    )
+
+    driver.execute_cdp_cmd(
+        "Page.addScriptToEvaluateOnNewDocument",
+        {
+            "source": """
+            Object.defineProperty(navigator, 'webdriver', {get: () => undefined})
+        """
+        },
+    )
+    driver.set_page_load_timeout(60)
+
+    artifact_writer = None
+
+    try:
+        if artifact_path:
+            artifact_writer = NetworkArtifactWriter(web_page, artifact_path)
+            driver.response_interceptor = artifact_writer.response_interceptor
+
+        driver.get(web_page)
+        sleep(sleep_time)
+
+        filtered_requests = list(
+            filter(
+                lambda request: re.search(
+                    regex_filter_string, request.url, re.IGNORECASE
+                ),
+                driver.requests,
+            )
+        )
+        output = format_har_entries(
+            [har_entry_from_request(request) for request in filtered_requests]
+        )
+        artifact_output = (
+            f"All the network/HTTP requests (unfiltered) are recorded in the network artifact: {artifact_writer.artifact_path}\n\n"
+            if artifact_writer
+            else ""
+        )
+
+        return f"Congratulations! The tool ran successfully.\n\nTotal network/HTTP requests with regex filter ({regex_filter_string}) are {len(filtered_requests)}. You can see the details of all these requests here: {output}. {artifact_output}Stop here and convey accordingly."
+
+    except Exception as e:
+        artifact_output = (
+            f"The network/HTTP requests recorded before the exception are in the network artifact: {artifact_path}\n\n"
+            if artifact_writer
+            else ""
+        )
+        return f"An exception occurred while using the tool!\nHere it is. {e}\n\n{artifact_output}Stop here and respond with the exception summary."
+    finally:
+        try:
+            if artifact_writer:
+                # The requests without a response never reach the response interceptor, hence record them here
+                artifact_writer.add_unrecorded_requests(driver.requests)
+        finally:
+            if artifact_writer:
+                artifact_writer.close()
+            if driver:
+                driver.quit()
@@ -0,0 +1,317 @@
+"""
+Local browser worker service.
+
+The browser-based tools (running JS code, fetching network requests) don't drive Chromium from the
+agent process. Instead, they submit jobs to a pool of worker processes. Each worker runs the job
+(and the browsers it launches) in its own process group, so that:
+- A job exceeding its timeout gets hard-killed along with its chromedriver/Chromium processes.
+- A job whose worker (including its browsers) exceeds the configured memory limit gets hard-killed the
+  same way. The memory is checked every second while the job runs, as the total proportional set size
+  (PSS) of the process group, so that the pages shared between Chromium processes are counted once.
+- Chromium crashes, hung pages and memory leaks never reach the agent process.
+
+Jobs and results are exchanged over a local socket pair. The job functions live in `src.adam.browser_jobs`,
+which doesn't import CrewAI, so that the workers stay lightweight.
+
+Configuration (environment variables):
+- ADAM_BROWSER_WORKERS: Number of worker processes (default 2).
+- ADAM_BROWSER_WORKER_MAX_RSS_MB: Memory (PSS) limit of a worker's process group in MB (default 1024).
+- ADAM_BROWSER_WORKER_MAX_JOBS: Number of jobs after which a worker gets recycled (default 50).
+"""
+
+import atexit
+import os
+import queue
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Optional
+
+# Number of seconds between two memory checks of a worker running a job
+RSS_CHECK_INTERVAL = 1
+
+
+def _get_process_pss(pid: str, rss: int) -> int:
+    """
+    Reads the proportional set size (PSS) of a process, i.e., its resident memory with every shared page
+    divided among the processes sharing it.
+
+    Args:
+        pid (str): The process ID.
+        rss (int): The process RSS in bytes, returned if its PSS isn't available.
+
+    Returns:
+        int: PSS in bytes (or else RSS).
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps_rollup_file:
+            for line in smaps_rollup_file:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return rss
+
+
+def get_process_group_memory(pgid: int) -> int:
+    """
+    Computes the total memory of all the processes in a process group, as the sum of their PSS.
+
+    Summing RSS instead would count the pages shared by chromedriver, the browser and its renderer/GPU/utility
+    processes once per process, largely overstating the memory of a Chromium session.
+
+    Args:
+        pgid (int): The process group ID.
+
+    Returns:
+        int: Total PSS in bytes (RSS for the processes without /proc/<pid>/smaps_rollup, e.g., on kernels
+        older than 4.14). Returns 0 if /proc isn't available (non-Linux systems).
+    """
+    if not os.path.isdir("/proc"):
+        return 0
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as stat_file:
+                # The process name (2nd field) may contain spaces, hence split after its closing bracket
+                fields = stat_file.read().rsplit(")", 1)[1].split()
+            # fields[0] is the 3rd field (state), so the 5th field (pgrp) is fields[2] and the 24th (rss) is fields[21]
+            if int(fields[2]) == pgid:
+                total += _get_process_pss(pid, int(fields[21]) * page_size)
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+def _worker_main(connection: Connection) -> None:
+    """
+    Main loop of a worker process. Receives jobs over the socket, runs them, and sends back the results.
+
+    Args:
+        connection (Connection): The worker's end of the socket pair.
+    """
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        function, kwargs = job
+        try:
+            connection.send(("ok", function(**kwargs)))
+        except Exception as e:
+            connection.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class BrowserWorker:
+    """
+    A single worker process along with the agent's end of its socket pair.
+
+    The worker is started as `python -m src.adam.browser_worker_service` rather than via multiprocessing,
+    whose spawned processes re-import the agent's `__main__` module (and hence CrewAI and the LLM stack).
+    It runs in a new session, i.e., its own process group.
+    """
+
+    def __init__(self) -> None:
+        agent_socket, worker_socket = socket.socketpair()
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", __name__, str(worker_socket.fileno())],
+            pass_fds=(worker_socket.fileno(),),
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            start_new_session=True,
+        )
+        worker_socket.close()
+        self.connection = Connection(agent_socket.detach())
+        self.jobs_done = 0
+
+    def get_memory(self) -> int:
+        """
+        Returns:
+            int: Total PSS (in bytes) of the worker and all its child processes.
+        """
+        return get_process_group_memory(self.process.pid)
+
+    def kill(self) -> None:
+        """
+        Hard-kills the worker along with every process (chromedriver, Chromium) in its process group.
+        """
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            self.process.kill()
+        self.process.wait(5)
+        self.connection.close()
+
+    def stop(self) -> None:
+        """
+        Asks the worker to exit gracefully, and kills it if it doesn't.
+        """
+        try:
+            self.connection.send(None)
+            self.process.wait(5)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            pass
+        if self.process.poll() is None:
+            self.kill()
+        else:
+            self.connection.close()
+
+
+class BrowserWorkerPool:
+    """
+    A pool of browser worker processes. Jobs wait in the pool's queue until a worker becomes idle.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_memory_bytes: int = 1024 * 1024 * 1024,
+        max_jobs_per_worker: int = 50,
+    ) -> None:
+        self.max_memory_bytes = max_memory_bytes
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.idle_workers: queue.Queue[BrowserWorker] = queue.Queue()
+        for _ in range(size):
+            self.idle_workers.put(BrowserWorker())
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def run_job(
+        self, function: Callable[..., Any], kwargs: dict[str, Any], timeout: float
+    ) -> Any:
+        """
+        Runs a job on an idle worker and waits for its result.
+
+        Args:
+            function (Callable[..., Any]): A module-level (picklable) function to run in the worker.
+            kwargs (dict[str, Any]): Keyword arguments for the function.
+            timeout (float): Number of seconds after which the job (and its worker) gets hard-killed.
+
+        Returns:
+            Any: The function's return value.
+
+        Raises:
+            TimeoutError: If the job doesn't finish within the timeout.
+            MemoryError: If the worker's process group exceeds the memory limit while running the job.
+            RuntimeError: If the job raised an exception or the worker died.
+        """
+        if self.closed:
+            raise RuntimeError("The browser worker pool is shut down.")
+
+        worker = self.idle_workers.get()
+        timed_out = False
+        over_memory = False
+        try:
+            worker.connection.send((function, kwargs))
+            deadline = time.monotonic() + timeout
+            # Wait for the result, checking the worker's memory in between
+            while not worker.connection.poll(
+                max(0, min(RSS_CHECK_INTERVAL, deadline - time.monotonic()))
+            ):
+                if worker.get_memory() > self.max_memory_bytes:
+                    over_memory = True
+                    break
+                if time.monotonic() >= deadline:
+                    timed_out = True
+                    break
+            if not timed_out and not over_memory:
+                status, result = worker.connection.recv()
+        except (EOFError, OSError) as e:
+            worker.kill()
+            worker = None
+            raise RuntimeError(f"The browser worker crashed. {e}")
+        finally:
+            if worker is not None and (timed_out or over_memory):
+                worker.kill()
+                worker = None
+            self._release(worker)
+
+        if timed_out:
+            raise TimeoutError(
+                f"The browser job didn't finish within {timeout} seconds and was killed."
+            )
+        if over_memory:
+            raise MemoryError(
+                f"The browser job exceeded the memory limit of {self.max_memory_bytes // (1024 * 1024)} MB and was killed."
+            )
+        if status == "error":
+            raise RuntimeError(result)
+        return result
+
+    def _release(self, worker: Optional[BrowserWorker]) -> None:
+        """
+        Puts a worker back in the idle queue, replacing it if it was killed, used up, or over the memory limit.
+
+        Args:
+            worker (Optional[BrowserWorker]): The worker that ran the job, or None if it was killed.
+        """
+        if worker is not None:
+            worker.jobs_done += 1
+            if (
+                worker.jobs_done >= self.max_jobs_per_worker
+                or worker.get_memory() > self.max_memory_bytes
+            ):
+                worker.stop()
+                worker = None
+
+        with self.lock:
+            if self.closed:
+                if worker is not None:
+                    worker.stop()
+                return
+            self.idle_workers.put(worker if worker is not None else BrowserWorker())
+
+    def shutdown(self) -> None:
+        """
+        Stops all the idle workers. Workers busy with a job are stopped when they get released.
+        """
+        with self.lock:
+            self.closed = True
+        while True:
+            try:
+                self.idle_workers.get_nowait().stop()
+            except queue.Empty:
+                break
+
+
+_browser_worker_pool: Optional[BrowserWorkerPool] = None
+_browser_worker_pool_lock = threading.Lock()
+
+
+def get_browser_worker_pool() -> BrowserWorkerPool:
+    """
+    Returns the process-wide browser worker pool, starting it on first use.
+
+    Returns:
+        BrowserWorkerPool: The shared browser worker pool.
+    """
+    global _browser_worker_pool
+    with _browser_worker_pool_lock:
+        if _browser_worker_pool is None:
+            _browser_worker_pool = BrowserWorkerPool(
+                size=int(os.getenv("ADAM_BROWSER_WORKERS", "2")),
+                max_memory_bytes=int(
+                    os.getenv("ADAM_BROWSER_WORKER_MAX_RSS_MB", "1024")
+                )
+                * 1024
+                * 1024,
+                max_jobs_per_worker=int(
+                    os.getenv("ADAM_BROWSER_WORKER_MAX_JOBS", "50")
+                ),
+            )
+            atexit.register(_browser_worker_pool.shutdown)
+        return _browser_worker_pool
+
+
+if __name__ == "__main__":
+    _worker_main(Connection(int(sys.argv[1])))
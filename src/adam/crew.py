@@ -9,8 +9,17 @@ from src.adam.tools.create_gtm_ga4_event_tag_tool import create_a_gtm_ga4_event_
 from src.adam.tools.fetch_network_requests_tool import (
     fetch_the_network_requests_on_page_load,
 )
+from src.adam.tools.filter_recorded_network_requests_tool import (
+    filter_the_recorded_network_requests,
+)
 from src.adam.tools.get_ga4_report_tool import get_a_ga4_report
+from src.adam.tools.get_gtm_workspace_entities_tool import (
+    get_the_gtm_workspace_entities,
+)
 from src.adam.tools.run_js_code_tool import run_a_js_code_on_a_web_page
+from src.adam.tools.validate_tracking_plan_tool import (
+    validate_the_recorded_ga4_hits_against_a_tracking_plan,
+)
 
 from datetime import datetime
 
@@ -35,7 +44,7 @@ class WebAnalyticsAutomationCrew:
 
     This class sets up agents and tasks for digital analytics automation,
     including GTM/GA4 event tagging, network request fetching, JS execution,
-    and GA4 reporting. Uses Anthropic Claude Sonnet via AWS Bedrock as the LLM.
+    GA4 reporting, and tracking plan validation. Uses Anthropic Claude Sonnet via AWS Bedrock as the LLM.
     """
 
     agents: List[BaseAgent]
@@ -55,8 +64,11 @@ class WebAnalyticsAutomationCrew:
             tools=[
                 run_a_js_code_on_a_web_page,
                 create_a_gtm_ga4_event_tag,
+                get_the_gtm_workspace_entities,
                 fetch_the_network_requests_on_page_load,
+                filter_the_recorded_network_requests,
                 get_a_ga4_report,
+                validate_the_recorded_ga4_hits_against_a_tracking_plan,
             ],
             llm=llm,
         )
@@ -0,0 +1,138 @@
+"""
+Conversion and post-processing of GA4 Data API reports.
+
+The reports are converted from the raw RunReportResponse protobuf into typed DataFrames, truncated to their
+top N rows, and compared across date ranges (period-over-period deltas). The row order set by the report's
+`order_bys` is preserved throughout.
+"""
+
+import numpy as np
+import pandas as pd
+from google.analytics.data_v1beta.types import MetricType
+from google.analytics.data_v1beta.types import RunReportResponse
+
+
+# GA4 adds this dimension to the response whenever more than one date range is requested
+DATE_RANGE_DIMENSION = "dateRange"
+
+
+def get_report_dataframe(response: RunReportResponse) -> pd.DataFrame:
+    """
+    Converts a GA4 RunReportResponse into a typed pandas DataFrame.
+
+    The values are read from the raw protobuf message in a single pass (bypassing the proto-plus
+    wrappers), and every metric column is then cast according to its `metric_headers[].type`.
+    Integer metrics become nullable integers, and all the other metric types (float, currency,
+    seconds, etc.) become floats.
+
+    Args:
+        response (RunReportResponse): The response returned by `BetaAnalyticsDataClient.run_report`.
+
+    Returns:
+        pd.DataFrame: The report with one column per dimension and metric.
+    """
+    pb = RunReportResponse.pb(response)
+    dimension_names = [header.name for header in pb.dimension_headers]
+    metric_headers = list(pb.metric_headers)
+
+    dimension_values = np.array(
+        [value.value for row in pb.rows for value in row.dimension_values],
+        dtype=object,
+    ).reshape(len(pb.rows), len(dimension_names))
+    metric_values = np.array(
+        [value.value for row in pb.rows for value in row.metric_values],
+        dtype=object,
+    ).reshape(len(pb.rows), len(metric_headers))
+
+    columns = {
+        name: dimension_values[:, i] for i, name in enumerate(dimension_names)
+    }
+    for i, header in enumerate(metric_headers):
+        values = pd.to_numeric(pd.Series(metric_values[:, i]), errors="coerce")
+        if header.type_ == MetricType.TYPE_INTEGER:
+            columns[header.name] = values.astype("Int64")
+        else:
+            columns[header.name] = values.astype("float64")
+
+    return pd.DataFrame(
+        columns, columns=dimension_names + [header.name for header in metric_headers]
+    )
+
+
+def get_top_n_rows(report: pd.DataFrame, top_n: int) -> pd.DataFrame:
+    """
+    Keeps the first N rows of an already ordered report. When the report spans multiple date ranges,
+    the first N rows are kept separately for each date range.
+
+    Args:
+        report (pd.DataFrame): The (server-side ordered) report.
+        top_n (int): Number of rows to keep.
+
+    Returns:
+        pd.DataFrame: The truncated report.
+    """
+    if DATE_RANGE_DIMENSION in report.columns:
+        return report.groupby(DATE_RANGE_DIMENSION, sort=False).head(top_n)
+    return report.head(top_n)
+
+
+def get_period_over_period_deltas(
+    report: pd.DataFrame, metrics: list[str]
+) -> pd.DataFrame:
+    """
+    Computes the period-over-period deltas of every metric across the report's date ranges.
+
+    The first date range ("date_range_0") is the baseline. For every other date range, two columns
+    are added per metric: the absolute delta and the percentage change with respect to the baseline.
+
+    Args:
+        report (pd.DataFrame): A report fetched with more than one date range.
+        metrics (list[str]): The metric columns to compare.
+
+    Returns:
+        pd.DataFrame: One row per combination of the remaining dimensions (in the order of their first
+        appearance in the report), with the metric values of every date range followed by the delta columns.
+    """
+    dimensions = [
+        column
+        for column in report.columns
+        if column not in metrics and column != DATE_RANGE_DIMENSION
+    ]
+    if not dimensions:
+        report = report.assign(total="Total")
+        dimensions = ["total"]
+    if report.empty:
+        return pd.DataFrame(columns=dimensions)
+
+    wide = report.pivot_table(
+        index=dimensions,
+        columns=DATE_RANGE_DIMENSION,
+        values=metrics,
+        aggfunc="sum",
+        fill_value=0,
+        observed=True,
+    )
+    # pivot_table sorts its index, so the (server-side) report order is restored from the first appearances
+    first_appearances = report[dimensions].drop_duplicates()
+    wide = wide.reindex(
+        pd.MultiIndex.from_frame(first_appearances)
+        if len(dimensions) > 1
+        else pd.Index(first_appearances[dimensions[0]], name=dimensions[0])
+    )
+    date_range_names = sorted(
+        report[DATE_RANGE_DIMENSION].unique(), key=lambda name: int(name.split("_")[-1])
+    )
+    baseline = date_range_names[0]
+
+    deltas = pd.DataFrame(index=wide.index)
+    for metric in metrics:
+        for date_range_name in date_range_names:
+            deltas[f"{metric} ({date_range_name})"] = wide[(metric, date_range_name)]
+        for date_range_name in date_range_names[1:]:
+            delta = wide[(metric, date_range_name)] - wide[(metric, baseline)]
+            deltas[f"{metric} delta ({date_range_name} vs {baseline})"] = delta
+            deltas[f"{metric} % change ({date_range_name} vs {baseline})"] = (
+                delta / wide[(metric, baseline)].replace(0, float("nan")) * 100
+            ).round(2)
+
+    return deltas.reset_index()
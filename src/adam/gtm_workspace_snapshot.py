@@ -0,0 +1,422 @@
+"""
+Local snapshots of GTM (Google Tag Manager) workspaces.
+
+A snapshot comprises all the tags, triggers and variables of a workspace. It's fetched once, cached in
+memory and on disk (`gtm_snapshots/`), and served to the GTM tools for lookups (trigger by name, tag by
+name or GA4 event name). The cached snapshot stays valid as long as the workspace fingerprint doesn't
+change, so reusing it costs a single `workspaces.get` call instead of listing every entity again.
+
+The tools also compare the entities they're about to write with the snapshot, so that only new or
+changed entities are sent to the Tag Manager API. After a write, the snapshot stays valid only if the
+workspace status (`workspaces.getStatus`) shows that the write was the only change since the snapshot.
+"""
+
+import json
+import os
+from typing import Any, Optional
+
+SNAPSHOTS_DIRECTORY = "gtm_snapshots"
+
+# Fields set by the Tag Manager API, which aren't part of an entity's configuration
+SERVER_FIELDS = {
+    "accountId",
+    "containerId",
+    "workspaceId",
+    "tagId",
+    "triggerId",
+    "variableId",
+    "path",
+    "fingerprint",
+    "tagManagerUrl",
+    "parentFolderId",
+}
+
+# The type of the GA4 Event Tags
+GA4_EVENT_TAG_TYPE = "gaawe"
+
+_snapshots: dict[str, "GTMWorkspaceSnapshot"] = {}
+
+
+class GTMWorkspaceSnapshot:
+    """
+    The tags, triggers and variables of a GTM workspace, indexed for lookups.
+    """
+
+    def __init__(
+        self,
+        workspace_path: str,
+        fingerprint: str,
+        tags: list[dict],
+        triggers: list[dict],
+        variables: list[dict],
+        changes: Optional[dict[str, str]] = None,
+    ) -> None:
+        self.workspace_path = workspace_path
+        self.fingerprint = fingerprint
+        self.changes = changes
+        self.tags = {tag["tagId"]: tag for tag in tags}
+        self.triggers = {trigger["triggerId"]: trigger for trigger in triggers}
+        self.variables = {variable["variableId"]: variable for variable in variables}
+        self.triggers_by_name = {
+            trigger["name"]: trigger for trigger in self.triggers.values()
+        }
+        self.tags_by_name = {}
+        self.tags_by_event_name = {}
+        for tag in self.tags.values():
+            self._index_tag(tag)
+
+    def _index_tag(self, tag: dict) -> None:
+        """
+        Adds a tag to the name and GA4 event name lookups. Only GA4 Event Tags are indexed by event name.
+
+        Args:
+            tag (dict): The GTM tag.
+        """
+        self.tags_by_name[tag["name"]] = tag
+        event_name = get_parameter_value(tag, "eventName")
+        if tag.get("type") == GA4_EVENT_TAG_TYPE and event_name is not None:
+            self.tags_by_event_name.setdefault(event_name, []).append(tag)
+
+    def get_trigger_by_name(self, name: str) -> Optional[dict]:
+        """
+        Args:
+            name (str): The trigger name.
+
+        Returns:
+            Optional[dict]: The GTM trigger, or None if it doesn't exist.
+        """
+        return self.triggers_by_name.get(name)
+
+    def get_tag_by_name(self, name: str) -> Optional[dict]:
+        """
+        Args:
+            name (str): The tag name.
+
+        Returns:
+            Optional[dict]: The GTM tag, or None if it doesn't exist.
+        """
+        return self.tags_by_name.get(name)
+
+    def get_tags_by_event_name(self, event_name: str) -> list[dict]:
+        """
+        Args:
+            event_name (str): The GA4 event name.
+
+        Returns:
+            list[dict]: The GA4 Event Tags sending the event.
+        """
+        return self.tags_by_event_name.get(event_name, [])
+
+    def put_tag(self, tag: dict) -> None:
+        """
+        Adds (or replaces) a tag in the snapshot after it's written via the Tag Manager API.
+
+        Args:
+            tag (dict): The GTM tag, as returned by the Tag Manager API.
+        """
+        previous = self.tags.get(tag["tagId"])
+        if previous is not None:
+            self.tags_by_name.pop(previous["name"], None)
+            event_name = get_parameter_value(previous, "eventName")
+            if event_name is not None:
+                self.tags_by_event_name[event_name] = [
+                    _tag
+                    for _tag in self.tags_by_event_name.get(event_name, [])
+                    if _tag["tagId"] != tag["tagId"]
+                ]
+        self.tags[tag["tagId"]] = tag
+        self._index_tag(tag)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            dict: The snapshot in a JSON-serializable form.
+        """
+        return {
+            "workspace_path": self.workspace_path,
+            "fingerprint": self.fingerprint,
+            "tags": list(self.tags.values()),
+            "triggers": list(self.triggers.values()),
+            "variables": list(self.variables.values()),
+            "changes": self.changes,
+        }
+
+
+def get_parameter_value(entity: dict, key: str) -> Optional[str]:
+    """
+    Reads the value of a top-level parameter of a GTM entity.
+
+    Args:
+        entity (dict): The GTM tag/trigger/variable.
+        key (str): The parameter key.
+
+    Returns:
+        Optional[str]: The parameter value, or None if the parameter doesn't exist.
+    """
+    for parameter in entity.get("parameter", []):
+        if parameter.get("key") == key:
+            return parameter.get("value")
+    return None
+
+
+def get_ga4_measurement_id(tag: dict) -> Optional[str]:
+    """
+    Reads the measurement ID of a GA4 Event Tag, set either via the "measurementIdOverride" parameter or
+    via the "measurementId" one.
+
+    Args:
+        tag (dict): The GA4 Event Tag.
+
+    Returns:
+        Optional[str]: The measurement ID, or None if the tag has none.
+    """
+    measurement_id = get_parameter_value(tag, "measurementIdOverride")
+    return (
+        measurement_id if measurement_id else get_parameter_value(tag, "measurementId")
+    )
+
+
+def merge_gtm_parameters(existing: list[dict], updated: list[dict]) -> list[dict]:
+    """
+    Merges parameters into the existing parameters of a GTM entity by key. The existing parameters keep
+    their order, the ones with an updated key are replaced, and the new ones are appended.
+
+    Args:
+        existing (list[dict]): The existing parameters.
+        updated (list[dict]): The parameters to replace/add.
+
+    Returns:
+        list[dict]: The merged parameters.
+    """
+    updated_by_key = {parameter["key"]: parameter for parameter in updated}
+    merged = [
+        updated_by_key.pop(parameter.get("key"), parameter) for parameter in existing
+    ]
+    return merged + list(updated_by_key.values())
+
+
+def _list_all(resource: Any, workspace_path: str, field: str) -> list[dict]:
+    """
+    Lists all the entities of a workspace, going through every page of results.
+
+    Args:
+        resource (Any): The Tag Manager API resource (tags, triggers or variables).
+        workspace_path (str): The workspace path (accounts/.../containers/.../workspaces/...).
+        field (str): The response field comprising the entities.
+
+    Returns:
+        list[dict]: The entities.
+    """
+    entities = []
+    page_token = None
+    while True:
+        response = resource.list(parent=workspace_path, pageToken=page_token).execute()
+        entities.extend(response.get(field, []))
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return entities
+
+
+def get_workspace_changes(
+    service: Any, workspace_path: str
+) -> Optional[dict[str, str]]:
+    """
+    Fetches the entities changed in a workspace (with respect to its base container version).
+
+    Args:
+        service (Any): The Tag Manager API (v2) service.
+        workspace_path (str): The workspace path (accounts/.../containers/.../workspaces/...).
+
+    Returns:
+        Optional[dict[str, str]]: The change status and fingerprint of every changed entity, by entity path.
+        None if the workspace has merge conflicts.
+    """
+    status = (
+        service.accounts()
+        .containers()
+        .workspaces()
+        .getStatus(path=workspace_path)
+        .execute()
+    )
+    if status.get("mergeConflict"):
+        return None
+
+    changes = {}
+    for change in status.get("workspaceChange", []):
+        for entity in change.values():
+            if isinstance(entity, dict):
+                changes[entity.get("path", json.dumps(entity, sort_keys=True))] = (
+                    f"{change.get('changeStatus')}:{entity.get('fingerprint')}"
+                )
+    return changes
+
+
+def _get_snapshot_file_name(workspace_path: str) -> str:
+    """
+    Args:
+        workspace_path (str): The workspace path (accounts/.../containers/.../workspaces/...).
+
+    Returns:
+        str: The path of the snapshot's cache file.
+    """
+    return os.path.join(SNAPSHOTS_DIRECTORY, workspace_path.replace("/", "_") + ".json")
+
+
+def invalidate_gtm_workspace_snapshot(workspace_path: str) -> None:
+    """
+    Drops a cached snapshot (e.g., after a write was rejected because of a stale entity fingerprint).
+
+    Args:
+        workspace_path (str): The workspace path (accounts/.../containers/.../workspaces/...).
+    """
+    _snapshots.pop(workspace_path, None)
+    if os.path.exists(_get_snapshot_file_name(workspace_path)):
+        os.remove(_get_snapshot_file_name(workspace_path))
+
+
+def save_gtm_workspace_snapshot(snapshot: GTMWorkspaceSnapshot) -> None:
+    """
+    Caches a snapshot in memory and on disk.
+
+    Args:
+        snapshot (GTMWorkspaceSnapshot): The workspace snapshot.
+    """
+    _snapshots[snapshot.workspace_path] = snapshot
+    os.makedirs(SNAPSHOTS_DIRECTORY, exist_ok=True)
+    with open(_get_snapshot_file_name(snapshot.workspace_path), "w") as snapshot_file:
+        json.dump(snapshot.to_dict(), snapshot_file)
+
+
+def get_gtm_workspace_snapshot(
+    service: Any, account_id: str, container_id: str, workspace_id: str
+) -> GTMWorkspaceSnapshot:
+    """
+    Returns the snapshot of a GTM workspace. The cached snapshot (in memory, or else on disk) is reused if
+    the workspace fingerprint hasn't changed. Otherwise, all the tags, triggers and variables are fetched again.
+
+    Args:
+        service (Any): The Tag Manager API (v2) service.
+        account_id (str): The Google Tag Manager account ID.
+        container_id (str): The Google Tag Manager container ID.
+        workspace_id (str): The Google Tag Manager workspace ID.
+
+    Returns:
+        GTMWorkspaceSnapshot: The up-to-date workspace snapshot.
+    """
+    workspace_path = (
+        f"accounts/{account_id}/containers/{container_id}/workspaces/{workspace_id}"
+    )
+    workspaces = service.accounts().containers().workspaces()
+    fingerprint = workspaces.get(path=workspace_path).execute()["fingerprint"]
+
+    snapshot = _snapshots.get(workspace_path)
+    if snapshot is None and os.path.exists(_get_snapshot_file_name(workspace_path)):
+        with open(_get_snapshot_file_name(workspace_path)) as snapshot_file:
+            snapshot = GTMWorkspaceSnapshot(**json.load(snapshot_file))
+        _snapshots[workspace_path] = snapshot
+    if snapshot is not None and snapshot.fingerprint == fingerprint:
+        return snapshot
+
+    # The changes are fetched before the entities, so that any later change shows up when comparing them
+    changes = get_workspace_changes(service, workspace_path)
+    snapshot = GTMWorkspaceSnapshot(
+        workspace_path=workspace_path,
+        fingerprint=fingerprint,
+        changes=changes,
+        tags=_list_all(workspaces.tags(), workspace_path, "tag"),
+        triggers=_list_all(workspaces.triggers(), workspace_path, "trigger"),
+        variables=_list_all(workspaces.variables(), workspace_path, "variable"),
+    )
+    save_gtm_workspace_snapshot(snapshot)
+    return snapshot
+
+
+def refresh_gtm_workspace_snapshot_after_write(
+    service: Any, snapshot: GTMWorkspaceSnapshot, written_path: str
+) -> bool:
+    """
+    Keeps a snapshot valid after writing an entity (already put in the snapshot), by accepting the new
+    workspace fingerprint. It's only accepted if the written entity is the only change since the snapshot,
+    i.e., the workspace changes other than the written entity are the same as when the snapshot was taken.
+    Otherwise, the snapshot is invalidated.
+
+    Args:
+        service (Any): The Tag Manager API (v2) service.
+        snapshot (GTMWorkspaceSnapshot): The workspace snapshot.
+        written_path (str): The path of the written entity.
+
+    Returns:
+        bool: Whether the snapshot is still valid.
+    """
+    workspaces = service.accounts().containers().workspaces()
+    # The fingerprint is fetched before the changes, so that any later change shows up when comparing them
+    fingerprint = workspaces.get(path=snapshot.workspace_path).execute()["fingerprint"]
+    changes = get_workspace_changes(service, snapshot.workspace_path)
+
+    if (
+        snapshot.changes is None
+        or changes is None
+        or written_path not in changes
+        or {
+            path: change
+            for path, change in snapshot.changes.items()
+            if path != written_path
+        }
+        != {path: change for path, change in changes.items() if path != written_path}
+    ):
+        invalidate_gtm_workspace_snapshot(snapshot.workspace_path)
+        return False
+
+    snapshot.fingerprint = fingerprint
+    snapshot.changes = changes
+    save_gtm_workspace_snapshot(snapshot)
+    return True
+
+
+def _normalize(value: Any) -> Any:
+    """
+    Normalizes a GTM entity field for comparison: parameter lists are order-insensitive, and empty
+    values are equivalent to missing ones.
+
+    Args:
+        value (Any): The field value.
+
+    Returns:
+        Any: The normalized value.
+    """
+    if isinstance(value, dict):
+        return {
+            key: _normalize(_value)
+            for key, _value in value.items()
+            if _value not in (None, "", [], {})
+        }
+    if isinstance(value, list):
+        normalized = [_normalize(_value) for _value in value]
+        return sorted(normalized, key=lambda _value: json.dumps(_value, sort_keys=True))
+    return value
+
+
+def diff_gtm_entity(existing: dict, desired: dict) -> dict[str, tuple[Any, Any]]:
+    """
+    Compares the configuration of an existing GTM entity with the desired one. Only the fields
+    present in the desired entity are compared, the rest of the existing configuration is kept as is.
+
+    Args:
+        existing (dict): The existing entity, as cached in the workspace snapshot.
+        desired (dict): The desired entity (request body).
+
+    Returns:
+        dict[str, tuple[Any, Any]]: The changed fields, with their existing and desired values.
+        It's empty if the entity is up to date.
+    """
+    changes = {}
+    for key in set(desired) - SERVER_FIELDS:
+        existing_value = _normalize(existing.get(key))
+        desired_value = _normalize(desired.get(key))
+        if existing_value in ("", [], {}):
+            existing_value = None
+        if desired_value in ("", [], {}):
+            desired_value = None
+        if existing_value != desired_value:
+            changes[key] = (existing.get(key), desired.get(key))
+    return changes
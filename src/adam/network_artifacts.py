@@ -0,0 +1,363 @@
+"""
+Recording and replaying of page-load network captures.
+
+A network artifact comprises two files:
+- `<name>.har.gz`: A gzip-compressed HAR 1.2 file. It's written incrementally while capturing, one gzip
+  member per HAR entry, and closed by a last member ending the HAR "entries" array. Once closed,
+  decompressing the whole file (e.g., `gunzip`) yields a valid HAR file.
+- `<name>.idx.jsonl`: An index with one JSON line per HAR entry, comprising the byte offset and length of
+  its gzip member along with the request method, URL and response status.
+
+Hence, specific requests can be queried by memory-mapping the artifact and decompressing only the
+matching entries, without loading the web page again or decompressing everything.
+
+If the capture gets killed (e.g., its browser worker exceeds the timeout or the memory limit), the artifact
+is left without its closing member. Decompressing it then yields a truncated HAR file, but the entries
+recorded until then remain readable through the index (i.e., via `NetworkArtifactReader`).
+"""
+
+import json
+import mmap
+import os
+import re
+import threading
+import zlib
+from datetime import datetime
+from typing import Any, Optional
+from urllib.parse import parse_qsl, unquote_plus, urlsplit
+
+ARTIFACTS_DIRECTORY = "network_artifacts"
+INDEX_SUFFIX = ".idx.jsonl"
+
+
+def _gzip_member(data: bytes) -> bytes:
+    """
+    Compresses data into a standalone gzip member. Concatenated gzip members form a valid gzip stream.
+
+    Args:
+        data (bytes): Data to compress.
+
+    Returns:
+        bytes: The gzip member.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+# The last gzip member of a closed artifact, ending the HAR "entries" array
+CLOSING_MEMBER = _gzip_member(b"]}}")
+
+
+def get_network_artifact_path(
+    web_page: str, directory: str = ARTIFACTS_DIRECTORY
+) -> str:
+    """
+    Generates the path of a new network artifact, creating its directory if needed.
+
+    Args:
+        web_page (str): The URL of the web page to capture.
+        directory (str): The artifacts directory.
+
+    Returns:
+        str: The path of the artifact (".har.gz" file).
+    """
+    os.makedirs(directory, exist_ok=True)
+    name = f"{urlsplit(web_page).netloc or 'page'}_network_{datetime.now().strftime(r'%d-%m-%Y %H-%M-%S-%f')}"
+    return os.path.join(directory, f"{name}.har.gz")
+
+
+def _get_index_path(artifact_path: str) -> str:
+    """
+    Args:
+        artifact_path (str): The path of the network artifact (".har.gz" file).
+
+    Returns:
+        str: The path of its index.
+    """
+    return artifact_path.removesuffix(".har.gz") + INDEX_SUFFIX
+
+
+def _har_headers(headers: Any) -> list[dict[str, str]]:
+    """
+    Converts Selenium Wire headers into HAR name/value pairs.
+
+    Args:
+        headers (Any): Selenium Wire request/response headers.
+
+    Returns:
+        list[dict[str, str]]: HAR headers.
+    """
+    return [{"name": name, "value": value} for name, value in headers.items()]
+
+
+def har_entry_from_request(request: Any, response: Optional[Any] = None) -> dict:
+    """
+    Builds a HAR entry from a Selenium Wire request (and its response, if available).
+
+    Args:
+        request (Any): The Selenium Wire request.
+        response (Optional[Any]): The Selenium Wire response. Defaults to `request.response`.
+
+    Returns:
+        dict: The HAR entry. Response bodies aren't stored, only their size.
+    """
+    response = response if response is not None else request.response
+    body = request.body.decode(errors="replace") if request.body else ""
+    elapsed = (
+        (response.date - request.date).total_seconds() * 1000
+        if response is not None
+        else -1
+    )
+
+    entry = {
+        "pageref": "page_1",
+        "startedDateTime": request.date.astimezone().isoformat(),
+        "time": elapsed,
+        "request": {
+            "method": request.method,
+            "url": request.url,
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": _har_headers(request.headers),
+            "queryString": [
+                {"name": name, "value": value}
+                for name, value in parse_qsl(
+                    urlsplit(request.url).query, keep_blank_values=True
+                )
+            ],
+            "headersSize": -1,
+            "bodySize": len(request.body or b""),
+        },
+        "response": {
+            "status": response.status_code if response is not None else 0,
+            "statusText": response.reason if response is not None else "",
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": _har_headers(response.headers) if response is not None else [],
+            "content": {
+                "size": len(response.body or b"") if response is not None else 0,
+                "mimeType": (
+                    response.headers.get("Content-Type", "")
+                    if response is not None
+                    else ""
+                ),
+            },
+            "redirectURL": "",
+            "headersSize": -1,
+            "bodySize": len(response.body or b"") if response is not None else -1,
+        },
+        "cache": {},
+        "timings": {"send": 0, "wait": elapsed, "receive": 0},
+    }
+    if body:
+        entry["request"]["postData"] = {
+            "mimeType": request.headers.get("Content-Type", ""),
+            "text": body,
+        }
+    return entry
+
+
+def format_har_entries(entries: list[dict]) -> str:
+    """
+    Formats HAR entries into the numbered text listing returned by the network request tools.
+
+    Args:
+        entries (list[dict]): HAR entries.
+
+    Returns:
+        str: The formatted listing.
+    """
+    output = ""
+    for i, entry in enumerate(entries):
+        url = entry["request"]["url"]
+        method = entry["request"]["method"]
+        output += f"{i + 1}. URL: {unquote_plus(url)}\n\ta. Method: {method}\n\tb. Response Status Code: {entry['response']['status']}\n\t"
+        if method == "GET":
+            qsp = url.split("?")
+            qsp = unquote_plus(qsp[1]) if len(qsp) > 1 else "No Query String Parameters"
+            output += f"c. Query String Parameters:\n\t\t{qsp}\n\n"
+        else:
+            body = entry["request"].get("postData", {}).get("text", "")
+            body = unquote_plus(body) if body else "No Parameters/Empty Body"
+            output += f"c. Body:\n\t\t{body}\n\n"
+    return output
+
+
+class NetworkArtifactWriter:
+    """
+    Incrementally writes HAR entries into a compressed network artifact along with its index.
+    It's thread-safe, since Selenium Wire calls its interceptors from the proxy threads.
+    """
+
+    def __init__(self, web_page: str, artifact_path: str) -> None:
+        started = datetime.now()
+        self.artifact_path = artifact_path
+        self.index_path = _get_index_path(artifact_path)
+        self.artifact_file = open(self.artifact_path, "wb")
+        self.index_file = open(self.index_path, "w")
+        self.lock = threading.Lock()
+        self.entries = 0
+        self.request_ids = set()
+        self.closed = False
+
+        header = {
+            "version": "1.2",
+            "creator": {"name": "ADAM", "version": "0.1.0"},
+            "pages": [
+                {
+                    "startedDateTime": started.astimezone().isoformat(),
+                    "id": "page_1",
+                    "title": web_page,
+                    "pageTimings": {},
+                }
+            ],
+        }
+        # The HAR file is left open after the "entries" array, and closed by `close`
+        self.artifact_file.write(
+            _gzip_member(json.dumps({"log": header})[:-2].encode() + b', "entries": [')
+        )
+        self.artifact_file.flush()
+
+    def add_entry(self, entry: dict, request_id: Optional[str] = None) -> None:
+        """
+        Appends a HAR entry to the artifact, and its location to the index.
+
+        Args:
+            entry (dict): The HAR entry.
+            request_id (Optional[str]): The Selenium Wire request ID. An entry is recorded only once per request ID.
+        """
+        with self.lock:
+            if self.closed or (
+                request_id is not None and request_id in self.request_ids
+            ):
+                return
+            if request_id is not None:
+                self.request_ids.add(request_id)
+            member = _gzip_member(
+                (b"," if self.entries else b"") + json.dumps(entry).encode()
+            )
+            offset = self.artifact_file.tell()
+            self.artifact_file.write(member)
+            self.artifact_file.flush()
+            self.index_file.write(
+                json.dumps(
+                    {
+                        "offset": offset,
+                        "length": len(member),
+                        "method": entry["request"]["method"],
+                        "url": entry["request"]["url"],
+                        "status": entry["response"]["status"],
+                    }
+                )
+                + "\n"
+            )
+            self.index_file.flush()
+            self.entries += 1
+
+    def response_interceptor(self, request: Any, response: Any) -> None:
+        """
+        A Selenium Wire response interceptor recording every request as soon as its response arrives.
+
+        Args:
+            request (Any): The Selenium Wire request.
+            response (Any): The Selenium Wire response.
+        """
+        self.add_entry(har_entry_from_request(request, response), request.id)
+
+    def add_unrecorded_requests(self, requests: list[Any]) -> None:
+        """
+        Records the requests that didn't reach the response interceptor, i.e., the ones without a response
+        (still pending, aborted, blocked, etc.). Their response status is 0.
+
+        Args:
+            requests (list[Any]): All the Selenium Wire requests captured on the page load.
+        """
+        for request in requests:
+            self.add_entry(har_entry_from_request(request), request.id)
+
+    def close(self) -> None:
+        """
+        Closes the HAR "entries" array and the files.
+        """
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.artifact_file.write(CLOSING_MEMBER)
+            self.artifact_file.close()
+            self.index_file.close()
+
+
+class NetworkArtifactReader:
+    """
+    Queries a network artifact by memory-mapping it and decompressing only the requested entries.
+    Only the indexed entries are read, so artifacts left unclosed by a killed capture are readable too
+    (`complete` is False for them).
+    """
+
+    def __init__(self, artifact_path: str) -> None:
+        self.artifact_path = artifact_path
+        self.index_path = _get_index_path(artifact_path)
+        with open(self.index_path) as index_file:
+            # A killed capture may leave a partially written last line, whose entry is skipped
+            self.index = [
+                json.loads(line) for line in index_file if line.endswith("\n")
+            ]
+        self.artifact_file = open(artifact_path, "rb")
+        self.mmap = mmap.mmap(self.artifact_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.complete = self.mmap[-len(CLOSING_MEMBER) :] == CLOSING_MEMBER
+
+    def get_page_url(self) -> str:
+        """
+        Reads the URL of the loaded web page from the artifact's header (its first gzip member).
+
+        Returns:
+            str: The web page URL.
+        """
+        header_length = self.index[0]["offset"] if self.index else len(self.mmap)
+        header = zlib.decompressobj(31).decompress(self.mmap[:header_length])
+        return json.loads(header + b"]}}")["log"]["pages"][0]["title"]
+
+    def get_entry(self, position: int) -> dict:
+        """
+        Decompresses a single HAR entry.
+
+        Args:
+            position (int): Position of the entry in the index.
+
+        Returns:
+            dict: The HAR entry.
+        """
+        record = self.index[position]
+        member = self.mmap[record["offset"] : record["offset"] + record["length"]]
+        return json.loads(zlib.decompress(member, 31).lstrip(b","))
+
+    def filter(self, regex_filter_string: str) -> list[dict]:
+        """
+        Fetches the HAR entries whose URL matches a regex filter (case-insensitive).
+
+        Args:
+            regex_filter_string (str): The regex filter string.
+
+        Returns:
+            list[dict]: The matching HAR entries, in capture order.
+        """
+        pattern = re.compile(regex_filter_string, re.IGNORECASE)
+        return [
+            self.get_entry(position)
+            for position, record in enumerate(self.index)
+            if pattern.search(record["url"])
+        ]
+
+    def close(self) -> None:
+        """
+        Releases the memory map and the file.
+        """
+        self.mmap.close()
+        self.artifact_file.close()
+
+    def __enter__(self) -> "NetworkArtifactReader":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
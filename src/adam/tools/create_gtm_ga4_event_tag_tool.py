@@ -1,8 +1,23 @@
 from typing import Optional
 from googleapiclient.discovery import build
 from src.adam.utility_functions import get_gcp_service_account_credentials
+from src.adam.gtm_workspace_snapshot import (
+    GA4_EVENT_TAG_TYPE,
+    diff_gtm_entity,
+    get_ga4_measurement_id,
+    get_gtm_workspace_snapshot,
+    invalidate_gtm_workspace_snapshot,
+    merge_gtm_parameters,
+    refresh_gtm_workspace_snapshot_after_write,
+)
 from crewai.tools import tool
 
+# The parameters of an existing GA4 Event Tag replaced on an update, all the others are kept
+UPDATED_PARAMETER_KEYS = {"eventName", "measurementIdOverride", "eventSettingsTable"}
+
+# The tag fields only set on a creation, an update keeps their existing values
+CREATION_ONLY_FIELDS = {"tagFiringOption", "monitoringMetadata", "consentSettings"}
+
 
 @tool
 def create_a_gtm_ga4_event_tag(
@@ -14,6 +29,7 @@ def create_a_gtm_ga4_event_tag(
     ga4_event_parameters: list[dict[str, str]],
     ga4_measurement_id: str,
     trigger_ids: Optional[list[str]] = None,
+    trigger_names: Optional[list[str]] = None,
     notes: Optional[str] = None,
 ) -> str:
     """
@@ -21,6 +37,8 @@ def create_a_gtm_ga4_event_tag(
 
     Note that this tool is only for the GA4 Event Tags. It can't create other GTM tags (Google Ads, Google Tag, etc.)
 
+    If the workspace already has a GA4 Event Tag with the same name, that tag gets updated instead of creating a duplicate. Only its event name, measurement ID and event parameters are updated, along with its triggers and notes if trigger_ids/trigger_names/notes are passed; the rest of its configuration is kept. If its configuration is already the same, nothing is changed. If the existing tag with the same name isn't a GA4 Event Tag, it isn't changed, and the conflict is reported back instead. If the workspace has a differently named GA4 Event Tag sending the same event to the same measurement ID, nothing is created, and the existing tag(s) are reported back instead.
+
     It takes in the following parameters:
     * account_id (str): The Google Tag Manager account ID to create the tag in
     * container_id (str): The Google Tag Manager container ID to create the tag in
@@ -31,6 +49,7 @@ def create_a_gtm_ga4_event_tag(
     * ga4_measurement_id (str): The GA4 Measurement ID to send the event data to
     * The following parameters are optional:
         * trigger_ids ([list[str]]): It represents a list of the various existing GTM triggers that decide the tag firing conditions. The default value here is None
+        * trigger_names ([list[str]]): Same as trigger_ids, but with the names of the existing GTM triggers instead of their IDs. Both can be used together. The default value here is None
         * notes (str): Any user-specific notes for the tag
 
     It returns a string specifying whether the tool ran successfully or encountered an exception. You should stop in either scenario and respond accordingly.
@@ -43,62 +62,126 @@ def create_a_gtm_ga4_event_tag(
             ["https://www.googleapis.com/auth/tagmanager.edit.containers"],
         ),
     )
-    request = (
-        service.accounts()
-        .containers()
-        .workspaces()
-        .tags()
-        .create(
-            parent=f"accounts/{account_id}/containers/{container_id}/workspaces/{workspace_id}",
-            body={
-                "accountId": account_id,
-                "containerId": container_id,
-                "workspaceId": workspace_id,
-                "name": name,
-                "type": "gaawe",
-                "parameter": [
-                    {"type": "boolean", "key": "sendEcommerceData", "value": "false"},
-                    {"type": "boolean", "key": "enhancedUserId", "value": "false"},
-                    {
-                        "type": "list",
-                        "key": "eventSettingsTable",
-                        "list": [
-                            {
-                                "type": "map",
-                                "map": [
-                                    {
-                                        "type": "template",
-                                        "key": "parameter",
-                                        "value": list(parameter.keys())[0],
-                                    },
-                                    {
-                                        "type": "template",
-                                        "key": "parameterValue",
-                                        "value": list(parameter.values())[0],
-                                    },
-                                ],
-                            }
-                            for parameter in ga4_event_parameters
-                        ],
-                    },
-                    {"type": "template", "key": "eventName", "value": ga4_event_name},
-                    {
-                        "type": "template",
-                        "key": "measurementIdOverride",
-                        "value": ga4_measurement_id,
-                    },
-                ],
-                "firingTriggerId": trigger_ids,
-                "tagFiringOption": "oncePerEvent",
-                "monitoringMetadata": {"type": "map"},
-                "consentSettings": {"consentStatus": "notSet"},
-                "notes": notes,
-            },
-        )
+    workspace_path = (
+        f"accounts/{account_id}/containers/{container_id}/workspaces/{workspace_id}"
     )
+    workspaces = service.accounts().containers().workspaces()
 
     try:
-        response = request.execute()
-        return f"Congratulations! The GA4 Event Tag creation was successful.\n\nStop here and confirm successful task completion."
+        snapshot = get_gtm_workspace_snapshot(
+            service, account_id, container_id, workspace_id
+        )
+
+        trigger_ids = list(trigger_ids or [])
+        for trigger_name in trigger_names or []:
+            trigger = snapshot.get_trigger_by_name(trigger_name)
+            if trigger is None:
+                return f'An exception occurred while using the tool!\nHere it is. There is no trigger named "{trigger_name}" in the workspace.\n\nStop here and respond with the exception summary.'
+            trigger_ids.append(trigger["triggerId"])
+
+        body = {
+            "accountId": account_id,
+            "containerId": container_id,
+            "workspaceId": workspace_id,
+            "name": name,
+            "type": GA4_EVENT_TAG_TYPE,
+            "parameter": [
+                {"type": "boolean", "key": "sendEcommerceData", "value": "false"},
+                {"type": "boolean", "key": "enhancedUserId", "value": "false"},
+                {
+                    "type": "list",
+                    "key": "eventSettingsTable",
+                    "list": [
+                        {
+                            "type": "map",
+                            "map": [
+                                {
+                                    "type": "template",
+                                    "key": "parameter",
+                                    "value": list(parameter.keys())[0],
+                                },
+                                {
+                                    "type": "template",
+                                    "key": "parameterValue",
+                                    "value": list(parameter.values())[0],
+                                },
+                            ],
+                        }
+                        for parameter in ga4_event_parameters
+                    ],
+                },
+                {"type": "template", "key": "eventName", "value": ga4_event_name},
+                {
+                    "type": "template",
+                    "key": "measurementIdOverride",
+                    "value": ga4_measurement_id,
+                },
+            ],
+            "tagFiringOption": "oncePerEvent",
+            "monitoringMetadata": {"type": "map"},
+            "consentSettings": {"consentStatus": "notSet"},
+        }
+        # The unset optional fields are left out, so that updating a tag keeps its existing triggers and notes
+        if trigger_ids:
+            body["firingTriggerId"] = trigger_ids
+        if notes is not None:
+            body["notes"] = notes
+
+        existing_tag = snapshot.get_tag_by_name(name)
+        if existing_tag is None:
+            # Multiple tags may send the same event (e.g., with different triggers), hence only report them
+            similar_tags = [
+                tag
+                for tag in snapshot.get_tags_by_event_name(ga4_event_name)
+                if get_ga4_measurement_id(tag) == ga4_measurement_id
+            ]
+            if similar_tags:
+                similar_tags = ", ".join(
+                    f"{tag['name']} (ID: {tag['tagId']}, Firing Trigger IDs: {', '.join(tag.get('firingTriggerId', [])) or 'None'})"
+                    for tag in similar_tags
+                )
+                return f"The workspace already has GA4 Event Tag(s) sending the {ga4_event_name} event to {ga4_measurement_id}: {similar_tags}. Hence, no tag was created, to avoid a possible duplicate.\n\nStop here, convey these tags, and ask the user whether a new tag named {name} is still needed (or to use the existing tag's name to update it)."
+        elif existing_tag.get("type") != GA4_EVENT_TAG_TYPE:
+            return f"The workspace already has a tag named {name} (ID: {existing_tag['tagId']}), but it isn't a GA4 Event Tag (its type is {existing_tag.get('type')}). Hence, it wasn't changed, and no tag was created.\n\nStop here, convey the conflict, and ask the user for another tag name."
+
+        if existing_tag is None:
+            response = (
+                workspaces.tags().create(parent=workspace_path, body=body).execute()
+            )
+            message = "The GA4 Event Tag creation was successful."
+        else:
+            # Only the tag's event settings (and the passed triggers/notes) are updated, the rest is kept as is
+            desired = {
+                key: value
+                for key, value in body.items()
+                if key not in CREATION_ONLY_FIELDS and key != "parameter"
+            }
+            desired["parameter"] = merge_gtm_parameters(
+                existing_tag.get("parameter", []),
+                [
+                    parameter
+                    for parameter in body["parameter"]
+                    if parameter["key"] in UPDATED_PARAMETER_KEYS
+                ],
+            )
+            changes = diff_gtm_entity(existing_tag, desired)
+            if not changes:
+                return f"Congratulations! The GA4 Event Tag ({existing_tag['name']}) already exists with the same configuration, so nothing was changed.\n\nStop here and confirm successful task completion."
+            response = (
+                workspaces.tags()
+                .update(
+                    path=existing_tag["path"],
+                    fingerprint=existing_tag["fingerprint"],
+                    body={**existing_tag, **desired},
+                )
+                .execute()
+            )
+            message = f"A tag named {existing_tag['name']} already existed, so it was updated instead of creating a duplicate. The changed fields are: {', '.join(sorted(changes))}."
+
+        snapshot.put_tag(response)
+        refresh_gtm_workspace_snapshot_after_write(service, snapshot, response["path"])
+        return f"Congratulations! {message}\n\nStop here and confirm successful task completion."
     except Exception as e:
+        # The cached snapshot may be stale (e.g., an outdated tag fingerprint), hence fetch it again next time
+        invalidate_gtm_workspace_snapshot(workspace_path)
         return f"An exception occurred while using the tool!\nHere it is. {e}\n\nStop here and respond with the exception summary."
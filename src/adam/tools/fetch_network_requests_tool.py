@@ -1,16 +1,18 @@
-from time import sleep
-import re
-from urllib.parse import unquote_plus
+import os
+from typing import Optional
 from crewai.tools import tool
 
-from selenium.webdriver.chrome.service import Service as ChromeService
-import seleniumwire.webdriver
-from seleniumwire.webdriver import ChromeOptions
+from src.adam.browser_jobs import fetch_network_requests_job
+from src.adam.browser_worker_service import get_browser_worker_pool
+from src.adam.network_artifacts import get_network_artifact_path
 
 
 @tool
 def fetch_the_network_requests_on_page_load(
-    web_page: str, sleep_time: int, regex_filter_string: str
+    web_page: str,
+    sleep_time: int,
+    regex_filter_string: str,
+    record_artifact: Optional[bool] = False,
 ) -> str:
     """
     Use this tool to fetch/get all the network/HTTP requests to a specific URL on a web page load. It will help you fetch/get all the network/HTTP requests to any particular URL on any web page load.
@@ -19,62 +21,30 @@ def fetch_the_network_requests_on_page_load(
     * web_page (str): A complete URL of the web page where we need to fetch/get the network/HTTP requests from. The URL should comprise the protocol (HTTP or HTTPS)
     * sleep_time (int): Number of seconds to wait after loading the web page and before fetching/getting the network requests
     * regex_filter_string (str): A regex filter string to filter only the requests to a specific URL
+    * The following parameter is optional:
+        * record_artifact (bool): Use True to record all the network/HTTP requests on the page load (not just the filtered ones) in a compressed HAR artifact. The artifact can later be filtered offline, without loading the web page again, via the "filter_the_recorded_network_requests" tool. The default value is False.
 
     It returns a string specifying whether the tool ran successfully or encountered an exception. You should stop in either scenario and respond accordingly.
     """
-    options = ChromeOptions()
-
-    # Run in headless mode (no GUI)
-    options.add_argument("--headless=new")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-
-    driver = seleniumwire.webdriver.Chrome(
-        service=ChromeService("/usr/bin/chromedriver"), options=options
-    )
-
-    driver.execute_cdp_cmd(
-        "Page.addScriptToEvaluateOnNewDocument",
-        {
-            "source": """
-            Object.defineProperty(navigator, 'webdriver', {get: () => undefined})
-        """
-        },
-    )
-    driver.set_page_load_timeout(60)
+    artifact_path = get_network_artifact_path(web_page) if record_artifact else None
 
     try:
-        driver.get(web_page)
-        sleep(sleep_time)
-
-        filtered_requests = list(
-            filter(
-                lambda request: re.search(
-                    regex_filter_string, request.url, re.IGNORECASE
-                ),
-                driver.requests,
-            )
+        # The page load timeout is 60 seconds, the rest is a margin for the browser start/shutdown
+        return get_browser_worker_pool().run_job(
+            fetch_network_requests_job,
+            {
+                "web_page": web_page,
+                "sleep_time": sleep_time,
+                "regex_filter_string": regex_filter_string,
+                "artifact_path": artifact_path,
+            },
+            timeout=sleep_time + 120,
         )
-        output = ""
-        for i, request in enumerate(filtered_requests):
-            output += f"{i + 1}. URL: {unquote_plus(request.url)}\n\ta. Method: {request.method}\n\tb. Response Status Code: {request.response.status_code}\n\t"
-            if request.method == "GET":
-                qsp = request.url.split("?")
-                qsp = (
-                    unquote_plus(qsp[1])
-                    if len(qsp) > 1
-                    else "No Query String Parameters"
-                )
-                output += f"c. Query String Parameters:\n\t\t{qsp}\n\n"
-            else:
-                body = request.body.decode()
-                body = unquote_plus(body) if body else "No Parameters/Empty Body"
-                output += f"c. Body:\n\t\t{body}\n\n"
-
-        return f"Congratulations! The tool ran successfully.\n\nTotal network/HTTP requests with regex filter ({regex_filter_string}) are {len(filtered_requests)}. You can see the details of all these requests here: {output}. Stop here and convey accordingly."
-
     except Exception as e:
-        return f"An exception occurred while using the tool!\nHere it is. {e}\n\nStop here and respond with the exception summary."
-    finally:
-        if driver:
-            driver.quit()
+        # A killed job leaves its artifact unclosed, but the requests recorded until then are still readable
+        artifact_output = (
+            f"The network/HTTP requests recorded before the exception are in the network artifact: {artifact_path}\nIt can only be read via the \"filter_the_recorded_network_requests\" tool.\n\n"
+            if artifact_path and os.path.exists(artifact_path)
+            else ""
+        )
+        return f"An exception occurred while using the tool!\nHere it is. {e}\n\n{artifact_output}Stop here and respond with the exception summary."
@@ -0,0 +1,32 @@
+from crewai.tools import tool
+
+from src.adam.network_artifacts import NetworkArtifactReader, format_har_entries
+
+
+@tool
+def filter_the_recorded_network_requests(
+    artifact_path: str, regex_filter_string: str
+) -> str:
+    """
+    Use this tool to filter the network/HTTP requests recorded in a network artifact (a ".har.gz" file) by the "fetch_the_network_requests_on_page_load" tool. It will help you fetch/get the network/HTTP requests to any particular URL from an earlier page load, without loading the web page again.
+
+    It takes in the following parameters:
+    * artifact_path (str): The path of the network artifact, as returned by the "fetch_the_network_requests_on_page_load" tool
+    * regex_filter_string (str): A regex filter string to filter only the requests to a specific URL
+
+    It returns a string specifying whether the tool ran successfully or encountered an exception. You should stop in either scenario and respond accordingly.
+    """
+    try:
+        with NetworkArtifactReader(artifact_path) as reader:
+            filtered_entries = reader.filter(regex_filter_string)
+            complete = reader.complete
+
+        output = format_har_entries(filtered_entries)
+        incomplete_output = (
+            ""
+            if complete
+            else "Note that the page load recorded in this artifact was interrupted (e.g., killed on a timeout). Hence, it only comprises the requests recorded until then.\n\n"
+        )
+        return f"Congratulations! The tool ran successfully.\n\nTotal recorded network/HTTP requests with regex filter ({regex_filter_string}) are {len(filtered_entries)}. You can see the details of all these requests here: {output}. {incomplete_output}Stop here and convey accordingly."
+    except Exception as e:
+        return f"An exception occurred while using the tool!\nHere it is. {e}\n\nStop here and respond with the exception summary."
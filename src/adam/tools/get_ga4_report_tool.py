@@ -6,9 +6,16 @@ from google.analytics.data_v1beta.types import Filter
 from google.analytics.data_v1beta.types import FilterExpression
 from google.analytics.data_v1beta.types import FilterExpressionList
 from google.analytics.data_v1beta.types import Metric
+from google.analytics.data_v1beta.types import OrderBy
 from google.analytics.data_v1beta.types import RunReportRequest
 import pandas as pd
 from datetime import datetime
+from src.adam.ga4_reports import (
+    DATE_RANGE_DIMENSION,
+    get_period_over_period_deltas,
+    get_report_dataframe,
+    get_top_n_rows,
+)
 from src.adam.utility_functions import get_gcp_service_account_credentials
 from crewai.tools import tool
 
@@ -23,6 +30,8 @@ def get_a_ga4_report(
     dimension_regex_filters: Optional[dict[str, str]] = dict(),
     sort_by_metrics: Optional[list[str]] = [],
     ascending_bools: Optional[list[bool]] = [],
+    top_n: Optional[int] = None,
+    compute_period_deltas: Optional[bool] = False,
 ) -> str:
     """
     Use this tool to get/run a report from/on a GA4 property. It will help you get/run any report from/on any GA4 property. Strictly do not try to interpret the input dates. It doesn't matter if they are from the past or in the future. Simply use the tool with the input dates, get the output, and respond accordingly.
@@ -35,11 +44,13 @@ def get_a_ga4_report(
     * stream_id (str): The Stream ID within the GA4 property to get/run the report from/on
     * The following parameters are optional:
         * dimension_regex_filters (dict[str, str]): It is a Python dictionary object representing the applicable regex filters on different dimensions. The dictionary keys will be the various dimensions to apply the regex filter on, and the values will be the corresponding regex filter string. The default value is an empty dictionary.
-        * sort_by_metrics (list[str]) and ascending_bools (list[bool]) are also optional parameters. They sort the report by any metric(s) from the `metrics` parameter. The former comprises the names of all the metrics to sort by, and the latter (a list of Python booleans) denotes the sorting order for each metric. Use True to sort the report by a metric in ascending order and False in descending order.
+        * sort_by_metrics (list[str]) and ascending_bools (list[bool]) are also optional parameters. They sort the report by any metric(s) from the `metrics` parameter. The former comprises the names of all the metrics to sort by, and the latter (a list of Python booleans) denotes the sorting order for each metric. Use True to sort the report by a metric in ascending order and False in descending order. The sorting is done by GA4 itself while generating the report.
+        * top_n (int): Keep only the first N rows of the (sorted) report. If multiple date ranges are passed, the first N rows are kept for each date range. The default value is None (keep all the rows).
+        * compute_period_deltas (bool): Only applicable when multiple date ranges are passed. Use True to compute the period-over-period deltas (absolute and percentage change) of every metric with respect to the first date range. The deltas are computed on the full report. If top_n is also passed, only the deltas of the dimension values in the top N rows are kept. The default value is False.
 
     It returns a string specifying whether the tool ran successfully or encountered an exception. You should stop in either scenario and respond accordingly.
 
-    The report (if fetched/extracted successfully) gets saved in an Excel file. If the report's rows are less than 50, then the output string also comprises the report data (dimensions and metrics values). Otherwise, the report will only be available in the Excel file. You should convey the user accordingly.
+    The report (if fetched/extracted successfully) gets saved in an Excel file. If the report's rows are less than 50, then the output string also comprises the report data (dimensions and metrics values). Otherwise, the report will only be available in the Excel file. The same applies to the period-over-period deltas, which get saved in a separate sheet of the same Excel file. You should convey the user accordingly.
     """
     # client = BetaAnalyticsDataClient(credentials = get_gcp_service_account_credentials('../ga4-apis-practice@ga4-apis-practice.json', ['https://www.googleapis.com/auth/analytics.readonly']))
     client = BetaAnalyticsDataClient(
@@ -49,8 +60,17 @@ def get_a_ga4_report(
         )
     )
 
+    dimension_names = dimensions
+    metric_names = metrics
     dimensions = [Dimension(name=dimension) for dimension in dimensions]
     metrics = [Metric(name=metric) for metric in metrics]
+    order_bys = [
+        OrderBy(
+            metric=OrderBy.MetricOrderBy(metric_name=metric),
+            desc=not (ascending_bools[i] if i < len(ascending_bools) else True),
+        )
+        for i, metric in enumerate(sort_by_metrics)
+    ]
     date_ranges = [
         DateRange(start_date=date_range[0], end_date=date_range[1])
         for date_range in date_ranges
@@ -87,36 +107,45 @@ def get_a_ga4_report(
                     ]
                 )
             ),
-            limit=250000,
+            order_bys=order_bys,
+            # With a single date range, the top N rows can be fetched directly
+            limit=top_n if top_n and len(date_ranges) == 1 else 250000,
         )
 
         response = client.run_report(request)
 
-        data = []
-        for row in response.rows:
-            _row = []
-            for dimension_value in row.dimension_values:
-                _row.append(dimension_value.value)
-            for metric_value in row.metric_values:
-                _row.append(metric_value.value)
-            data.append(_row)
+        report = get_report_dataframe(response)
 
-        columns = []
-        for dimension in response.dimension_headers:
-            columns.append(dimension.name)
-        for metric in response.metric_headers:
-            columns.append(metric.name)
+        # The deltas are computed on the full report, so that every dimension value has its actual baseline
+        deltas = None
+        if compute_period_deltas and DATE_RANGE_DIMENSION in report.columns:
+            deltas = get_period_over_period_deltas(report, metric_names)
+
+        if top_n:
+            report = get_top_n_rows(report, top_n)
+            if deltas is not None and dimension_names:
+                # Keep the deltas of the dimension values in the top N rows of any date range
+                deltas = deltas.merge(
+                    report[dimension_names].drop_duplicates(), on=dimension_names
+                )
 
-        report = pd.DataFrame(data, columns=columns)
         file_name = f"ga4_reports/{property_id}-{stream_id}_report_{datetime.now().strftime(r'%d-%m-%Y %H-%M-%S')}.xlsx"
-        report.to_excel(file_name, index=False)
+        with pd.ExcelWriter(file_name) as writer:
+            report.to_excel(writer, sheet_name="report", index=False)
+            if deltas is not None:
+                deltas.to_excel(writer, sheet_name="period_deltas", index=False)
 
-        if sort_by_metrics:
-            report.sort_values(sort_by_metrics, ascending=ascending_bools, inplace=True)
+        deltas_output = ""
+        if deltas is not None:
+            deltas_output = (
+                f"Here are the period-over-period deltas.\n\n{deltas}\n\n"
+                if len(deltas) < 50
+                else "The period-over-period deltas have more than 50 rows. Hence, they are only available in the \"period_deltas\" sheet of the above Excel file.\n\n"
+            )
 
         if len(report) < 50:
-            return f"Congratulations! The tool ran successfully.\n\nYou can see the Excel export here: {file_name}\nThe report has less than 50 rows. Here is the report.\n\n{report}\n\nStop here and convey accordingly."
+            return f"Congratulations! The tool ran successfully.\n\nYou can see the Excel export here: {file_name}\nThe report has less than 50 rows. Here is the report.\n\n{report}\n\n{deltas_output}Stop here and convey accordingly."
         else:
-            return f"Congratulations! The tool ran successfully.\n\nYou can see the Excel export here: {file_name}\nThe report has more than 50 rows. Hence, it is only available in the above Excel file. Stop here and convey accordingly."
+            return f"Congratulations! The tool ran successfully.\n\nYou can see the Excel export here: {file_name}\nThe report has more than 50 rows. Hence, it is only available in the above Excel file.\n\n{deltas_output}Stop here and convey accordingly."
     except Exception as e:
         return f"An exception occurred while using the tool!\nHere it is. {e}\n\nStop here and respond with the exception summary."
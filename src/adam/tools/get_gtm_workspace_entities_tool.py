@@ -0,0 +1,101 @@
+import os
+import pandas as pd
+from datetime import datetime
+from googleapiclient.discovery import build
+from src.adam.utility_functions import get_gcp_service_account_credentials
+from src.adam.gtm_workspace_snapshot import (
+    get_gtm_workspace_snapshot,
+    get_parameter_value,
+)
+from crewai.tools import tool
+
+
+@tool
+def get_the_gtm_workspace_entities(
+    account_id: str, container_id: str, workspace_id: str
+) -> str:
+    """
+    Use this tool to get/list the existing tags, triggers and variables in a GTM (Google Tag Manager) configuration (account/container/workspace). It will help you find the existing GTM triggers (and their IDs) to fire a tag on, and check whether a tag already exists before creating it.
+
+    It takes in the following parameters:
+    * account_id (str): The Google Tag Manager account ID
+    * container_id (str): The Google Tag Manager container ID
+    * workspace_id (str): The Google Tag Manager workspace ID
+
+    It returns a string specifying whether the tool ran successfully or encountered an exception. You should stop in either scenario and respond accordingly.
+
+    All the tags, triggers and variables (with their IDs, types, GA4 event names and firing triggers) get saved in an Excel file. For every entity type with less than 50 entities, the output string also comprises their names. Otherwise, they will only be available in the Excel file. You should convey the user accordingly.
+    """
+    service = build(
+        "tagmanager",
+        "v2",
+        credentials=get_gcp_service_account_credentials(
+            "../ga4-apis-practice@ga4-apis-practice.json",
+            ["https://www.googleapis.com/auth/tagmanager.edit.containers"],
+        ),
+    )
+
+    try:
+        snapshot = get_gtm_workspace_snapshot(
+            service, account_id, container_id, workspace_id
+        )
+
+        entities = {
+            "tags": pd.DataFrame(
+                [
+                    {
+                        "name": tag["name"],
+                        "id": tag["tagId"],
+                        "type": tag["type"],
+                        "ga4_event_name": get_parameter_value(tag, "eventName"),
+                        "firing_trigger_ids": ", ".join(tag.get("firingTriggerId", [])),
+                    }
+                    for tag in snapshot.tags.values()
+                ],
+                columns=["name", "id", "type", "ga4_event_name", "firing_trigger_ids"],
+            ),
+            "triggers": pd.DataFrame(
+                [
+                    {
+                        "name": trigger["name"],
+                        "id": trigger["triggerId"],
+                        "type": trigger["type"],
+                    }
+                    for trigger in snapshot.triggers.values()
+                ],
+                columns=["name", "id", "type"],
+            ),
+            "variables": pd.DataFrame(
+                [
+                    {
+                        "name": variable["name"],
+                        "id": variable["variableId"],
+                        "type": variable["type"],
+                    }
+                    for variable in snapshot.variables.values()
+                ],
+                columns=["name", "id", "type"],
+            ),
+        }
+
+        os.makedirs("gtm_workspace_entities", exist_ok=True)
+        file_name = f"gtm_workspace_entities/{account_id}-{container_id}-{workspace_id}_entities_{datetime.now().strftime(r'%d-%m-%Y %H-%M-%S')}.xlsx"
+        with pd.ExcelWriter(file_name) as writer:
+            for entity_type, entities_df in entities.items():
+                entities_df.to_excel(writer, sheet_name=entity_type, index=False)
+
+        # Only the names are returned (the tools look up the triggers and tags by name), the rest is in the Excel file
+        output = ""
+        for entity_type, entities_df in entities.items():
+            if len(entities_df) < 50:
+                names = "\n".join(
+                    f"\t{i + 1}. {entity_name}"
+                    for i, entity_name in enumerate(entities_df["name"])
+                )
+                output += f"{entity_type.capitalize()} ({len(entities_df)}):\n{names or chr(9) + 'None'}\n\n"
+            else:
+                output += f'{entity_type.capitalize()} ({len(entities_df)}): More than 50. Hence, they are only available in the "{entity_type}" sheet of the above Excel file.\n\n'
+
+        return f"Congratulations! The tool ran successfully.\n\nYou can see the Excel export (with the IDs, types, GA4 event names and firing triggers) here: {file_name}\n\n{output}Stop here and convey accordingly."
+    except Exception as e:
+        return f"An exception occurred while using the tool!\nHere it is. {e}\n\nStop here and respond with the exception summary."
@@ -1,10 +1,7 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from time import sleep
-
 from crewai.tools import tool
 
-from selenium.webdriver.chrome.options import Options
+from src.adam.browser_jobs import run_js_code_job
+from src.adam.browser_worker_service import get_browser_worker_pool
 
 
 @tool
@@ -19,33 +16,12 @@ def run_a_js_code_on_a_web_page(web_page: str, sleep_time: int, js_code: str) ->
 
     It returns a string specifying whether the tool ran successfully or encountered an exception. You should stop in either scenario and respond accordingly.
     """
-
-    options = Options()
-
-    # Run in headless mode (no GUI)
-    options.add_argument("--headless=new")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-
-    driver = webdriver.Chrome(
-        service=ChromeService("/usr/bin/chromedriver"), options=options
-    )
-
-    driver.execute_cdp_cmd(
-        "Page.addScriptToEvaluateOnNewDocument",
-        {
-            "source": """
-            Object.defineProperty(navigator, 'webdriver', {get: () => undefined})
-        """
-        },
-    )
-    driver.set_page_load_timeout(60)
-
     try:
-        driver.get(web_page)
-        sleep(sleep_time)
-        return f"Congratulations! The tool ran successfully.\n\nHere is the JS code output:\n{driver.execute_script(js_code)}"
+        # The page load timeout is 60 seconds, the rest is a margin for the browser start/shutdown
+        return get_browser_worker_pool().run_job(
+            run_js_code_job,
+            {"web_page": web_page, "sleep_time": sleep_time, "js_code": js_code},
+            timeout=sleep_time + 120,
+        )
     except Exception as e:
         return f"An exception occurred while using the tool!\nHere it is. {e}\n\nStop here and respond with the exception summary."
-    finally:
-        driver.quit()
@@ -0,0 +1,51 @@
+import os
+import pandas as pd
+from datetime import datetime
+from crewai.tools import tool
+
+from src.adam.tracking_plan_validation import (
+    get_pass_fail_matrix,
+    index_ga4_hits,
+    load_tracking_plan,
+    validate_tracking_plan,
+)
+
+
+@tool
+def validate_the_recorded_ga4_hits_against_a_tracking_plan(
+    tracking_plan_path: str, artifact_paths: list[str]
+) -> str:
+    """
+    Use this tool to validate the GA4 hits recorded in network artifacts (".har.gz" files recorded by the "fetch_the_network_requests_on_page_load" tool) against a tracking plan. It will help you check whether the expected GA4 events, along with their required parameters and parameter values, were sent on every page, without going through the requests yourself.
+
+    It takes in the following parameters:
+    * tracking_plan_path (str): The path of the tracking plan JSON file. It comprises a "rules" list, where each rule has an "event" (the expected GA4 event name), and optionally a "name", a "page_pattern" (regex of the page URLs the rule applies to), "required_parameters" (list of event parameter names), and "parameter_patterns" (dictionary of event parameter names and the regexes their values should match, whenever they're sent). Use the GA4 parameter names (e.g., currency, value, items, page_location, page_title), not the short keys sent by gtag
+    * artifact_paths (list[str]): A list of the network artifact paths (or of the directories comprising them) to validate. Each artifact represents one page load
+
+    It returns a string specifying whether the tool ran successfully or encountered an exception. You should stop in either scenario and respond accordingly.
+
+    The pass/fail matrix (pages vs rules) and the failure reasons (if validated successfully) get saved in an Excel file. If the failures are less than 50, then the output string also comprises them. Otherwise, they will only be available in the Excel file. You should convey the user accordingly.
+    """
+    try:
+        rules = load_tracking_plan(tracking_plan_path)
+        results = validate_tracking_plan(rules, index_ga4_hits(artifact_paths))
+        matrix = get_pass_fail_matrix(results)
+
+        os.makedirs("tracking_plan_reports", exist_ok=True)
+        file_name = f"tracking_plan_reports/tracking_plan_validation_{datetime.now().strftime(r'%d-%m-%Y %H-%M-%S')}.xlsx"
+        with pd.ExcelWriter(file_name) as writer:
+            matrix.to_excel(writer, sheet_name="pass_fail_matrix")
+            results.to_excel(writer, sheet_name="details", index=False)
+
+        failures = results[results["status"] == "FAIL"]
+        summary = f"The tracking plan has {len(rules)} rules, validated on {len(matrix)} pages. Out of the {len(results)} applicable checks, {len(results) - len(failures)} passed and {len(failures)} failed."
+        if failures.empty:
+            failures_output = ""
+        elif len(failures) < 50:
+            failures_output = f"Here are the failures.\n\n{failures.to_string(index=False)}\n\n"
+        else:
+            failures_output = "The failures are more than 50. Hence, they are only available in the \"details\" sheet of the above Excel file.\n\n"
+
+        return f"Congratulations! The tool ran successfully.\n\nYou can see the Excel export here: {file_name}\n{summary}\n\n{failures_output}Stop here and convey accordingly."
+    except Exception as e:
+        return f"An exception occurred while using the tool!\nHere it is. {e}\n\nStop here and respond with the exception summary."
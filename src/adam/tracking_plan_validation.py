@@ -0,0 +1,274 @@
+"""
+Validation of captured GA4 hits against a tracking plan.
+
+A tracking plan is a JSON file comprising a list of rules:
+
+    {
+        "rules": [
+            {
+                "name": "Add to cart on product pages",
+                "page_pattern": "/products/",
+                "event": "add_to_cart",
+                "required_parameters": ["currency", "value", "items"],
+                "parameter_patterns": {"currency": "^[A-Z]{3}$", "value": "^[0-9.]+$"}
+            }
+        ]
+    }
+
+Every rule applies to the pages whose URL matches its `page_pattern` (a regex; all the pages if omitted).
+A rule passes on a page if at least one hit of its event on that page has all the required parameters,
+and the values of the parameters it has match their patterns.
+
+The parameters are named as in GA4, whereas gtag sends them under short keys. For example, the above rule
+passes on this hit:
+
+    https://region1.google-analytics.com/g/collect?v=2&tid=G-XXXXXXXXXX&cu=USD&dl=https%3A%2F%2Fshop.example.com%2Fproducts%2Fmug&dt=Mug&en=add_to_cart&pr1=idSKU_1~nmMug~pr12.5~qt1&epn.value=12.5
+
+Its event parameters are "currency" (cu), "page_location" (dl), "page_title" (dt), "items" (pr1) and
+"value" (epn.value). User properties (up./upn.) are named "user_property.<name>".
+
+The hits are extracted from the network artifacts recorded by the network request tool (one artifact per
+page load). The regexes are compiled once per plan, and the hits are indexed by (page, event name), so the
+cost of a validation is proportional to the number of hits plus pages × rules.
+"""
+
+import glob
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+from src.adam.network_artifacts import NetworkArtifactReader
+
+# Matches GA4 hits sent to Google Analytics or to a server-side GTM container
+GA4_HIT_PATTERN = r"/g/collect(\?|$)"
+
+# Custom event parameters are sent as "ep.<name>" (strings) and "epn.<name>" (numbers), and user properties
+# as "up.<name>"/"upn.<name>". The prefixes are replaced by these ones.
+PARAMETER_PREFIXES = {
+    "ep.": "",
+    "epn.": "",
+    "up.": "user_property.",
+    "upn.": "user_property.",
+}
+
+# Standard GA4 parameters sent by gtag under short keys
+SHORT_PARAMETER_NAMES = {
+    "cu": "currency",
+    "dl": "page_location",
+    "dt": "page_title",
+    "dr": "page_referrer",
+    "ul": "language",
+    "sr": "screen_resolution",
+    "uid": "user_id",
+    "sid": "ga_session_id",
+    "sct": "ga_session_number",
+    "_et": "engagement_time_msec",
+}
+
+# Ecommerce items are sent as "pr1", "pr2", etc.
+ITEM_PARAMETER_PATTERN = re.compile(r"pr\d+")
+
+
+@dataclass
+class TrackingPlanRule:
+    """
+    A single tracking plan rule, with its regexes compiled.
+    """
+
+    name: str
+    event: str
+    page_pattern: re.Pattern
+    required_parameters: list[str] = field(default_factory=list)
+    parameter_patterns: dict[str, re.Pattern] = field(default_factory=dict)
+
+
+def load_tracking_plan(tracking_plan_path: str) -> list[TrackingPlanRule]:
+    """
+    Loads a tracking plan JSON file and compiles its regexes.
+
+    Args:
+        tracking_plan_path (str): Path to the tracking plan JSON file.
+
+    Returns:
+        list[TrackingPlanRule]: The tracking plan rules.
+    """
+    with open(tracking_plan_path) as tracking_plan_file:
+        tracking_plan = json.load(tracking_plan_file)
+
+    rules = []
+    for rule in tracking_plan["rules"]:
+        page_pattern = rule.get("page_pattern", ".*")
+        rules.append(
+            TrackingPlanRule(
+                name=rule.get("name", f"{rule['event']} ({page_pattern})"),
+                event=rule["event"],
+                page_pattern=re.compile(page_pattern, re.IGNORECASE),
+                required_parameters=rule.get("required_parameters", []),
+                parameter_patterns={
+                    parameter: re.compile(pattern)
+                    for parameter, pattern in rule.get("parameter_patterns", {}).items()
+                },
+            )
+        )
+
+    names = [rule.name for rule in rules]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(
+            f"The tracking plan rule names must be unique. Duplicates: {', '.join(sorted(duplicates))}"
+        )
+    return rules
+
+
+def parse_ga4_hits(entry: dict) -> list[tuple[str, dict[str, str]]]:
+    """
+    Extracts the GA4 events from a HAR entry of a GA4 hit. A hit may batch multiple events in its body
+    (one per line), each of them inheriting the parameters in the URL.
+
+    Args:
+        entry (dict): The HAR entry.
+
+    Returns:
+        list[tuple[str, dict[str, str]]]: The (event name, event parameters) pairs. The parameters are named
+        as in GA4 (see `PARAMETER_PREFIXES` and `SHORT_PARAMETER_NAMES`), and the ecommerce items are joined
+        into a single "items" parameter (one item per line).
+    """
+    shared = dict(parse_qsl(urlsplit(entry["request"]["url"]).query))
+    body = entry["request"].get("postData", {}).get("text", "")
+    lines = [line for line in body.splitlines() if line.strip()] or [""]
+
+    hits = []
+    for line in lines:
+        parameters = {**shared, **dict(parse_qsl(line))}
+        if "en" not in parameters:
+            continue
+        event_parameters = {}
+        items = []
+        for name, value in parameters.items():
+            if name in SHORT_PARAMETER_NAMES:
+                event_parameters[SHORT_PARAMETER_NAMES[name]] = value
+            elif ITEM_PARAMETER_PATTERN.fullmatch(name):
+                items.append(value)
+            else:
+                for prefix, replacement in PARAMETER_PREFIXES.items():
+                    if name.startswith(prefix):
+                        event_parameters[replacement + name[len(prefix) :]] = value
+                        break
+        if items:
+            event_parameters["items"] = "\n".join(items)
+        hits.append((parameters["en"], event_parameters))
+    return hits
+
+
+def index_ga4_hits(
+    artifact_paths: list[str],
+) -> dict[str, dict[str, list[dict[str, str]]]]:
+    """
+    Indexes the GA4 hits recorded in network artifacts by page and event name.
+
+    Args:
+        artifact_paths (list[str]): Paths of network artifacts (".har.gz" files), or of directories comprising them.
+
+    Returns:
+        dict[str, dict[str, list[dict[str, str]]]]: For every page URL, the event parameters of every hit by event name.
+    """
+    paths = []
+    for path in artifact_paths:
+        if os.path.isdir(path):
+            paths.extend(sorted(glob.glob(os.path.join(path, "*.har.gz"))))
+        else:
+            paths.append(path)
+
+    hits = {}
+    for path in paths:
+        with NetworkArtifactReader(path) as reader:
+            page_hits = hits.setdefault(reader.get_page_url(), {})
+            for entry in reader.filter(GA4_HIT_PATTERN):
+                for event, parameters in parse_ga4_hits(entry):
+                    page_hits.setdefault(event, []).append(parameters)
+    return hits
+
+
+def check_rule(
+    rule: TrackingPlanRule, event_hits: Optional[list[dict[str, str]]]
+) -> tuple[str, str]:
+    """
+    Checks a rule against the hits of its event on a page.
+
+    Args:
+        rule (TrackingPlanRule): The tracking plan rule.
+        event_hits (Optional[list[dict[str, str]]]): The event parameters of every hit of the rule's event on the page.
+
+    Returns:
+        tuple[str, str]: The status ("PASS"/"FAIL") and the reason of a failure (empty on a pass).
+    """
+    if not event_hits:
+        return "FAIL", f"The {rule.event} event wasn't sent"
+
+    reasons = []
+    for parameters in event_hits:
+        missing = [
+            parameter
+            for parameter in rule.required_parameters
+            if parameter not in parameters
+        ]
+        # Missing parameters aren't checked against their patterns, they're reported above if required
+        mismatched = [
+            parameter
+            for parameter, pattern in rule.parameter_patterns.items()
+            if parameter in parameters and not pattern.search(parameters[parameter])
+        ]
+        if not missing and not mismatched:
+            return "PASS", ""
+        reasons.append(
+            "; ".join(
+                ([f"missing parameters: {', '.join(missing)}"] if missing else [])
+                + (
+                    [f"invalid values of: {', '.join(mismatched)}"]
+                    if mismatched
+                    else []
+                )
+            )
+        )
+    return "FAIL", f"None of the {len(event_hits)} {rule.event} hit(s) is valid ({reasons[0]})"
+
+
+def validate_tracking_plan(
+    rules: list[TrackingPlanRule],
+    hits: dict[str, dict[str, list[dict[str, str]]]],
+) -> pd.DataFrame:
+    """
+    Evaluates every applicable tracking plan rule on every page.
+
+    Args:
+        rules (list[TrackingPlanRule]): The tracking plan rules.
+        hits (dict[str, dict[str, list[dict[str, str]]]]): The indexed GA4 hits, as returned by `index_ga4_hits`.
+
+    Returns:
+        pd.DataFrame: One row per (page, applicable rule), with the "page", "rule", "status" and "reason" columns.
+    """
+    results = []
+    for page, page_hits in hits.items():
+        for rule in rules:
+            if rule.page_pattern.search(page):
+                status, reason = check_rule(rule, page_hits.get(rule.event))
+                results.append((page, rule.name, status, reason))
+    return pd.DataFrame(results, columns=["page", "rule", "status", "reason"])
+
+
+def get_pass_fail_matrix(results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pivots the validation results into a pass/fail matrix.
+
+    Args:
+        results (pd.DataFrame): The validation results, as returned by `validate_tracking_plan`.
+
+    Returns:
+        pd.DataFrame: One row per page and one column per rule. Rules not applicable to a page are marked "N/A".
+    """
+    return results.pivot(index="page", columns="rule", values="status").fillna("N/A")
@@ -0,0 +1,100 @@
+import os
+import time
+
+import pytest
+
+from src.adam.browser_worker_service import BrowserWorkerPool, get_process_group_memory
+
+
+# The jobs are module-level functions, so that the workers can unpickle them
+def add_job(a: int, b: int) -> int:
+    return a + b
+
+
+def get_pid_job() -> int:
+    return os.getpid()
+
+
+def sleep_job(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def fail_job() -> None:
+    raise ValueError("The page didn't load")
+
+
+def crash_job() -> None:
+    os._exit(1)
+
+
+def allocate_job(megabytes: int, seconds: float) -> None:
+    data = b"x" * (megabytes * 1024 * 1024)
+    time.sleep(seconds)
+    del data
+
+
+@pytest.fixture
+def pool():
+    pool = BrowserWorkerPool(
+        size=1, max_memory_bytes=200 * 1024 * 1024, max_jobs_per_worker=3
+    )
+    yield pool
+    pool.shutdown()
+
+
+def test_run_job(pool):
+    assert pool.run_job(add_job, {"a": 1, "b": 2}, timeout=10) == 3
+
+
+def test_run_job_error(pool):
+    with pytest.raises(RuntimeError, match="ValueError: The page didn't load"):
+        pool.run_job(fail_job, {}, timeout=10)
+    # The worker survives the job's exception
+    assert pool.run_job(add_job, {"a": 1, "b": 2}, timeout=10) == 3
+
+
+def test_run_job_timeout(pool):
+    pid = pool.run_job(get_pid_job, {}, timeout=10)
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        pool.run_job(sleep_job, {"seconds": 30}, timeout=1)
+    assert time.monotonic() - started < 10
+
+    # The killed worker is replaced
+    assert pool.run_job(get_pid_job, {}, timeout=10) != pid
+
+
+def test_run_job_crash(pool):
+    pid = pool.run_job(get_pid_job, {}, timeout=10)
+
+    with pytest.raises(RuntimeError, match="crashed"):
+        pool.run_job(crash_job, {}, timeout=10)
+
+    assert pool.run_job(get_pid_job, {}, timeout=10) != pid
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="Requires /proc")
+def test_run_job_memory_limit(pool):
+    pid = pool.run_job(get_pid_job, {}, timeout=10)
+
+    started = time.monotonic()
+    with pytest.raises(MemoryError):
+        pool.run_job(allocate_job, {"megabytes": 300, "seconds": 30}, timeout=60)
+    assert time.monotonic() - started < 10
+
+    assert pool.run_job(get_pid_job, {}, timeout=10) != pid
+
+
+def test_worker_recycling(pool):
+    pids = [pool.run_job(get_pid_job, {}, timeout=10) for _ in range(4)]
+
+    assert len(set(pids[:3])) == 1
+    assert pids[3] != pids[0]
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="Requires /proc")
+def test_get_process_group_memory():
+    memory = get_process_group_memory(os.getpgid(0))
+
+    assert 0 < memory < 1024 * 1024 * 1024
@@ -0,0 +1,169 @@
+import pandas as pd
+from google.analytics.data_v1beta.types import (
+    DimensionHeader,
+    DimensionValue,
+    MetricHeader,
+    MetricType,
+    MetricValue,
+    Row,
+    RunReportResponse,
+)
+
+from src.adam.ga4_reports import (
+    get_period_over_period_deltas,
+    get_report_dataframe,
+    get_top_n_rows,
+)
+
+
+def get_response(
+    dimensions: list[str], metrics: list[tuple[str, int]], rows: list[list[str]]
+) -> RunReportResponse:
+    return RunReportResponse(
+        dimension_headers=[DimensionHeader(name=name) for name in dimensions],
+        metric_headers=[
+            MetricHeader(name=name, type_=metric_type) for name, metric_type in metrics
+        ],
+        rows=[
+            Row(
+                dimension_values=[
+                    DimensionValue(value=value) for value in row[: len(dimensions)]
+                ],
+                metric_values=[
+                    MetricValue(value=value) for value in row[len(dimensions) :]
+                ],
+            )
+            for row in rows
+        ],
+    )
+
+
+# Ordered by sessions (descending) within every date range, as requested via order_bys
+REPORT_RESPONSE = get_response(
+    ["pagePath", "dateRange"],
+    [
+        ("sessions", MetricType.TYPE_INTEGER),
+        ("averageSessionDuration", MetricType.TYPE_SECONDS),
+    ],
+    [
+        ["/products", "date_range_0", "300", "12.5"],
+        ["/home", "date_range_0", "200", "30"],
+        ["/about", "date_range_0", "100", "5.25"],
+        ["/home", "date_range_1", "400", "20"],
+        ["/products", "date_range_1", "150", "10"],
+        ["/about", "date_range_1", "50", "4"],
+    ],
+)
+
+
+def test_get_report_dataframe():
+    report = get_report_dataframe(REPORT_RESPONSE)
+
+    assert list(report.columns) == [
+        "pagePath",
+        "dateRange",
+        "sessions",
+        "averageSessionDuration",
+    ]
+    assert str(report["sessions"].dtype) == "Int64"
+    assert report["averageSessionDuration"].dtype == "float64"
+    assert report["sessions"].tolist() == [300, 200, 100, 400, 150, 50]
+    assert report["averageSessionDuration"].tolist() == [12.5, 30, 5.25, 20, 10, 4]
+    assert report["pagePath"].tolist()[:3] == ["/products", "/home", "/about"]
+
+
+def test_get_report_dataframe_empty():
+    report = get_report_dataframe(
+        get_response(["pagePath"], [("sessions", MetricType.TYPE_INTEGER)], [])
+    )
+
+    assert report.empty
+    assert list(report.columns) == ["pagePath", "sessions"]
+
+
+def test_get_top_n_rows_per_date_range():
+    report = get_top_n_rows(get_report_dataframe(REPORT_RESPONSE), 2)
+
+    assert report[["pagePath", "dateRange"]].values.tolist() == [
+        ["/products", "date_range_0"],
+        ["/home", "date_range_0"],
+        ["/home", "date_range_1"],
+        ["/products", "date_range_1"],
+    ]
+
+
+def test_get_top_n_rows_single_date_range():
+    report = pd.DataFrame({"pagePath": ["/b", "/a", "/c"], "sessions": [3, 2, 1]})
+
+    assert get_top_n_rows(report, 2)["pagePath"].tolist() == ["/b", "/a"]
+
+
+def test_get_period_over_period_deltas():
+    deltas = get_period_over_period_deltas(
+        get_report_dataframe(REPORT_RESPONSE), ["sessions", "averageSessionDuration"]
+    )
+
+    # The report order is kept, rather than the alphabetical one
+    assert deltas["pagePath"].tolist() == ["/products", "/home", "/about"]
+    products = deltas.iloc[0]
+    assert products["sessions (date_range_0)"] == 300
+    assert products["sessions (date_range_1)"] == 150
+    assert products["sessions delta (date_range_1 vs date_range_0)"] == -150
+    assert products["sessions % change (date_range_1 vs date_range_0)"] == -50
+    assert (
+        products["averageSessionDuration delta (date_range_1 vs date_range_0)"] == -2.5
+    )
+
+
+def test_get_period_over_period_deltas_multiple_dimensions():
+    report = get_report_dataframe(
+        get_response(
+            ["pagePath", "deviceCategory", "dateRange"],
+            [("sessions", MetricType.TYPE_INTEGER)],
+            [
+                ["/home", "mobile", "date_range_0", "10"],
+                ["/about", "desktop", "date_range_0", "8"],
+                ["/home", "desktop", "date_range_1", "6"],
+                ["/home", "mobile", "date_range_1", "0"],
+            ],
+        )
+    )
+
+    deltas = get_period_over_period_deltas(report, ["sessions"])
+
+    assert deltas[["pagePath", "deviceCategory"]].values.tolist() == [
+        ["/home", "mobile"],
+        ["/about", "desktop"],
+        ["/home", "desktop"],
+    ]
+    # Dimension values missing from a date range count as 0, and a 0 baseline has no % change
+    assert deltas["sessions delta (date_range_1 vs date_range_0)"].tolist() == [
+        -10,
+        -8,
+        6,
+    ]
+    assert pd.isna(deltas["sessions % change (date_range_1 vs date_range_0)"].iloc[2])
+
+
+def test_get_period_over_period_deltas_without_dimensions():
+    report = get_report_dataframe(
+        get_response(
+            ["dateRange"],
+            [("sessions", MetricType.TYPE_INTEGER)],
+            [["date_range_0", "100"], ["date_range_1", "120"]],
+        )
+    )
+
+    deltas = get_period_over_period_deltas(report, ["sessions"])
+
+    assert deltas["sessions % change (date_range_1 vs date_range_0)"].tolist() == [20]
+
+
+def test_get_period_over_period_deltas_empty():
+    report = get_report_dataframe(
+        get_response(
+            ["pagePath", "dateRange"], [("sessions", MetricType.TYPE_INTEGER)], []
+        )
+    )
+
+    assert get_period_over_period_deltas(report, ["sessions"]).empty
@@ -0,0 +1,228 @@
+import os
+
+import pytest
+
+from src.adam import gtm_workspace_snapshot
+from src.adam.gtm_workspace_snapshot import (
+    GTMWorkspaceSnapshot,
+    diff_gtm_entity,
+    get_ga4_measurement_id,
+    merge_gtm_parameters,
+    refresh_gtm_workspace_snapshot_after_write,
+)
+
+WORKSPACE_PATH = "accounts/1/containers/2/workspaces/3"
+TAG_PATH = f"{WORKSPACE_PATH}/tags/10"
+OTHER_TAG_PATH = f"{WORKSPACE_PATH}/tags/11"
+
+
+def get_tag(tag_id: str, name: str, tag_type: str = "gaawe", **parameters) -> dict:
+    return {
+        "path": f"{WORKSPACE_PATH}/tags/{tag_id}",
+        "tagId": tag_id,
+        "name": name,
+        "type": tag_type,
+        "fingerprint": "1",
+        "parameter": [
+            {"type": "template", "key": key, "value": value}
+            for key, value in parameters.items()
+        ],
+    }
+
+
+# Stub of the Tag Manager API (v2) service, serving a fixed workspace fingerprint and status
+class StubRequest:
+    def __init__(self, response: dict) -> None:
+        self.response = response
+
+    def execute(self) -> dict:
+        return self.response
+
+
+class StubWorkspaces:
+    def __init__(self, fingerprint: str, status: dict) -> None:
+        self.fingerprint = fingerprint
+        self.status = status
+
+    def get(self, path: str) -> StubRequest:
+        return StubRequest({"path": path, "fingerprint": self.fingerprint})
+
+    def getStatus(self, path: str) -> StubRequest:
+        return StubRequest(self.status)
+
+
+class StubService:
+    def __init__(self, fingerprint: str, status: dict) -> None:
+        self.workspaces_resource = StubWorkspaces(fingerprint, status)
+
+    def accounts(self) -> "StubService":
+        return self
+
+    def containers(self) -> "StubService":
+        return self
+
+    def workspaces(self) -> StubWorkspaces:
+        return self.workspaces_resource
+
+
+def get_status(*changes: tuple[str, str, str]) -> dict:
+    return {
+        "workspaceChange": [
+            {"changeStatus": status, "tag": {"path": path, "fingerprint": fingerprint}}
+            for path, status, fingerprint in changes
+        ]
+    }
+
+
+def test_diff_gtm_entity_order_insensitive_parameters():
+    existing = get_tag("10", "GA4 - add_to_cart", eventName="add_to_cart")
+    existing["parameter"].append(
+        {"type": "template", "key": "measurementIdOverride", "value": "G-1"}
+    )
+    desired = {"parameter": list(reversed(existing["parameter"]))}
+
+    assert diff_gtm_entity(existing, desired) == {}
+
+    desired["parameter"][0] = {
+        "type": "template",
+        "key": "measurementIdOverride",
+        "value": "G-2",
+    }
+    assert list(diff_gtm_entity(existing, desired)) == ["parameter"]
+
+
+def test_diff_gtm_entity_empty_and_missing_fields():
+    existing = {"name": "Tag", "notes": "", "parameter": [{"key": "a", "value": ""}]}
+
+    assert diff_gtm_entity(existing, {"firingTriggerId": []}) == {}
+    assert diff_gtm_entity(existing, {"notes": None}) == {}
+    assert diff_gtm_entity(existing, {"parameter": [{"key": "a"}]}) == {}
+    assert diff_gtm_entity(existing, {"notes": "New"}) == {"notes": ("", "New")}
+
+
+def test_diff_gtm_entity_ignores_server_and_unrequested_fields():
+    existing = get_tag("10", "Tag")
+    existing["tagFiringOption"] = "oncePerLoad"
+    desired = {
+        "name": "Tag",
+        "tagId": "99",
+        "fingerprint": "2",
+        "path": "other",
+        "accountId": "1",
+    }
+
+    assert diff_gtm_entity(existing, desired) == {}
+
+
+def test_merge_gtm_parameters():
+    existing = [
+        {"key": "eventName", "value": "old"},
+        {"key": "userProperties", "list": [{"type": "map"}]},
+        {"key": "sendEcommerceData", "value": "true"},
+    ]
+
+    merged = merge_gtm_parameters(
+        existing,
+        [
+            {"key": "eventName", "value": "new"},
+            {"key": "measurementIdOverride", "value": "G-1"},
+        ],
+    )
+
+    assert merged == [
+        {"key": "eventName", "value": "new"},
+        {"key": "userProperties", "list": [{"type": "map"}]},
+        {"key": "sendEcommerceData", "value": "true"},
+        {"key": "measurementIdOverride", "value": "G-1"},
+    ]
+
+
+def test_get_ga4_measurement_id():
+    assert (
+        get_ga4_measurement_id(get_tag("1", "A", measurementIdOverride="G-1")) == "G-1"
+    )
+    assert get_ga4_measurement_id(get_tag("2", "B", measurementId="G-2")) == "G-2"
+    assert get_ga4_measurement_id(get_tag("3", "C")) is None
+
+
+def test_tags_by_event_name_only_ga4_event_tags():
+    snapshot = GTMWorkspaceSnapshot(
+        workspace_path=WORKSPACE_PATH,
+        fingerprint="1",
+        tags=[
+            get_tag("10", "GA4 - purchase", eventName="purchase"),
+            get_tag("11", "Custom - purchase", "html", eventName="purchase"),
+        ],
+        triggers=[],
+        variables=[],
+    )
+
+    assert [tag["tagId"] for tag in snapshot.get_tags_by_event_name("purchase")] == [
+        "10"
+    ]
+
+    snapshot.put_tag(get_tag("11", "Custom - purchase", "html", eventName="refund"))
+    assert snapshot.get_tags_by_event_name("refund") == []
+
+
+@pytest.fixture
+def snapshot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gtm_workspace_snapshot, "_snapshots", {})
+    snapshot = GTMWorkspaceSnapshot(
+        workspace_path=WORKSPACE_PATH,
+        fingerprint="1",
+        tags=[],
+        triggers=[],
+        variables=[],
+        changes={OTHER_TAG_PATH: "updated:5"},
+    )
+    gtm_workspace_snapshot.save_gtm_workspace_snapshot(snapshot)
+    return snapshot
+
+
+def is_cached(snapshot: GTMWorkspaceSnapshot) -> bool:
+    return (
+        snapshot.workspace_path in gtm_workspace_snapshot._snapshots
+        and os.path.exists(
+            gtm_workspace_snapshot._get_snapshot_file_name(snapshot.workspace_path)
+        )
+    )
+
+
+def test_refresh_accepts_own_write(snapshot):
+    service = StubService(
+        "2", get_status((OTHER_TAG_PATH, "updated", "5"), (TAG_PATH, "added", "1"))
+    )
+
+    assert refresh_gtm_workspace_snapshot_after_write(service, snapshot, TAG_PATH)
+    assert snapshot.fingerprint == "2"
+    assert snapshot.changes == {OTHER_TAG_PATH: "updated:5", TAG_PATH: "added:1"}
+    assert is_cached(snapshot)
+
+
+@pytest.mark.parametrize(
+    "status",
+    [
+        # Another entity changed since the snapshot
+        get_status((OTHER_TAG_PATH, "updated", "6"), (TAG_PATH, "added", "1")),
+        # Another entity was reverted since the snapshot
+        get_status((TAG_PATH, "added", "1")),
+        # The written entity doesn't show up in the changes
+        get_status((OTHER_TAG_PATH, "updated", "5")),
+        {"mergeConflict": [{"entityInWorkspace": {"tag": {"path": TAG_PATH}}}]},
+    ],
+)
+def test_refresh_invalidates_on_other_changes(snapshot, status):
+    service = StubService("2", status)
+
+    assert not refresh_gtm_workspace_snapshot_after_write(service, snapshot, TAG_PATH)
+    assert not is_cached(snapshot)
+
+
+def test_refresh_invalidates_without_changes(snapshot):
+    snapshot.changes = None
+    service = StubService("2", get_status((TAG_PATH, "added", "1")))
+
+    assert not refresh_gtm_workspace_snapshot_after_write(service, snapshot, TAG_PATH)
+    assert not is_cached(snapshot)
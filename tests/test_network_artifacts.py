@@ -0,0 +1,134 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+
+from src.adam.network_artifacts import (
+    NetworkArtifactReader,
+    NetworkArtifactWriter,
+    get_network_artifact_path,
+)
+
+WEB_PAGE = "https://shop.example.com/products/mug"
+STARTED = datetime(2025, 1, 1, 12, 0, 0)
+
+
+# Stubs of the Selenium Wire request/response objects
+def get_response(status_code: int = 200) -> SimpleNamespace:
+    return SimpleNamespace(
+        status_code=status_code,
+        reason="OK",
+        headers={"Content-Type": "text/html"},
+        body=b"<html></html>",
+        date=STARTED + timedelta(milliseconds=150),
+    )
+
+
+def get_request(
+    request_id: str,
+    url: str,
+    method: str = "GET",
+    body: bytes = b"",
+    response: Optional[SimpleNamespace] = None,
+) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=request_id,
+        url=url,
+        method=method,
+        headers={"Content-Type": "text/plain"},
+        body=body,
+        date=STARTED,
+        response=response,
+    )
+
+
+@pytest.fixture
+def artifact_path(tmp_path):
+    return get_network_artifact_path(WEB_PAGE, str(tmp_path))
+
+
+def test_round_trip(artifact_path):
+    page = get_request("1", WEB_PAGE, response=get_response())
+    hit = get_request(
+        "2",
+        "https://region1.google-analytics.com/g/collect?v=2&en=page_view",
+        method="POST",
+        body=b"en=scroll",
+        response=get_response(204),
+    )
+    pending = get_request("3", "https://cdn.example.com/app.js")
+    script = get_request(
+        "4", "https://www.googletagmanager.com/gtag/js", response=get_response()
+    )
+
+    writer = NetworkArtifactWriter(WEB_PAGE, artifact_path)
+    writer.response_interceptor(page, page.response)
+    writer.response_interceptor(hit, hit.response)
+    # A request is recorded once, even if it's seen again
+    writer.response_interceptor(page, page.response)
+    writer.response_interceptor(script, script.response)
+    writer.add_unrecorded_requests([page, hit, pending, script])
+    writer.close()
+
+    with gzip.open(artifact_path) as artifact_file:
+        har = json.load(artifact_file)
+    assert har["log"]["version"] == "1.2"
+    assert har["log"]["pages"][0]["title"] == WEB_PAGE
+    assert [entry["request"]["url"] for entry in har["log"]["entries"]] == [
+        WEB_PAGE,
+        hit.url,
+        script.url,
+        pending.url,
+    ]
+
+    with NetworkArtifactReader(artifact_path) as reader:
+        assert reader.complete
+        assert reader.get_page_url() == WEB_PAGE
+        assert [entry["request"]["url"] for entry in reader.filter("GOOGLE")] == [
+            hit.url,
+            script.url,
+        ]
+        assert reader.filter("example.com") == [
+            har["log"]["entries"][0],
+            har["log"]["entries"][3],
+        ]
+        assert [entry["response"]["status"] for entry in reader.filter(".")] == [
+            200,
+            204,
+            200,
+            0,
+        ]
+        assert reader.filter("collect")[0]["request"]["postData"]["text"] == "en=scroll"
+
+
+def test_empty_artifact(artifact_path):
+    NetworkArtifactWriter(WEB_PAGE, artifact_path).close()
+
+    with gzip.open(artifact_path) as artifact_file:
+        assert json.load(artifact_file)["log"]["entries"] == []
+
+    with NetworkArtifactReader(artifact_path) as reader:
+        assert reader.complete
+        assert reader.get_page_url() == WEB_PAGE
+        assert reader.filter(".") == []
+
+
+def test_unclosed_artifact(artifact_path):
+    page = get_request("1", WEB_PAGE, response=get_response())
+    # A capture killed after recording a single request
+    writer = NetworkArtifactWriter(WEB_PAGE, artifact_path)
+    writer.response_interceptor(page, page.response)
+
+    with pytest.raises(json.JSONDecodeError):
+        with gzip.open(artifact_path) as artifact_file:
+            json.load(artifact_file)
+
+    with NetworkArtifactReader(artifact_path) as reader:
+        assert not reader.complete
+        assert reader.get_page_url() == WEB_PAGE
+        assert [entry["request"]["url"] for entry in reader.filter(".")] == [WEB_PAGE]
+
+    writer.close()
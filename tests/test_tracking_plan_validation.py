@@ -0,0 +1,104 @@
+import re
+
+from src.adam.tracking_plan_validation import (
+    TrackingPlanRule,
+    check_rule,
+    parse_ga4_hits,
+)
+
+
+def get_entry(url: str, body: str = "") -> dict:
+    entry = {"request": {"method": "POST" if body else "GET", "url": url}}
+    if body:
+        entry["request"]["postData"] = {"mimeType": "text/plain", "text": body}
+    return entry
+
+
+ADD_TO_CART_RULE = TrackingPlanRule(
+    name="Add to cart",
+    event="add_to_cart",
+    page_pattern=re.compile("/products/"),
+    required_parameters=["currency", "value", "items"],
+    parameter_patterns={
+        "currency": re.compile("^[A-Z]{3}$"),
+        "coupon": re.compile("^[A-Z0-9]+$"),
+    },
+)
+
+
+def test_parse_ga4_hits_get():
+    hits = parse_ga4_hits(
+        get_entry(
+            "https://region1.google-analytics.com/g/collect?v=2&tid=G-XXXXXXXXXX&cu=USD"
+            "&dl=https%3A%2F%2Fshop.example.com%2Fproducts%2Fmug&dt=Mug&en=add_to_cart"
+            "&pr1=idSKU_1~nmMug~pr12.5~qt1&epn.value=12.5&up.plan=pro"
+        )
+    )
+
+    assert hits == [
+        (
+            "add_to_cart",
+            {
+                "currency": "USD",
+                "page_location": "https://shop.example.com/products/mug",
+                "page_title": "Mug",
+                "items": "idSKU_1~nmMug~pr12.5~qt1",
+                "value": "12.5",
+                "user_property.plan": "pro",
+            },
+        )
+    ]
+
+
+def test_parse_ga4_hits_batched_post():
+    hits = parse_ga4_hits(
+        get_entry(
+            "https://region1.google-analytics.com/g/collect?v=2&tid=G-XXXXXXXXXX&cu=EUR&dt=Mug",
+            "en=view_item&ep.item_category=mugs\r\n"
+            "en=add_to_cart&epn.value=9&pr1=idSKU_1~qt1&pr2=idSKU_2~qt2\r\n",
+        )
+    )
+
+    assert hits == [
+        (
+            "view_item",
+            {"currency": "EUR", "page_title": "Mug", "item_category": "mugs"},
+        ),
+        (
+            "add_to_cart",
+            {
+                "currency": "EUR",
+                "page_title": "Mug",
+                "value": "9",
+                "items": "idSKU_1~qt1\nidSKU_2~qt2",
+            },
+        ),
+    ]
+
+
+def test_check_rule_passes_on_batched_post_hit():
+    hits = parse_ga4_hits(
+        get_entry(
+            "https://region1.google-analytics.com/g/collect?v=2&cu=EUR",
+            "en=page_view\r\nen=add_to_cart&epn.value=9&pr1=idSKU_1~qt1",
+        )
+    )
+    add_to_cart_hits = [
+        parameters for event, parameters in hits if event == "add_to_cart"
+    ]
+
+    # The optional "coupon" parameter isn't sent, which isn't a failure
+    assert check_rule(ADD_TO_CART_RULE, add_to_cart_hits) == ("PASS", "")
+
+
+def test_check_rule_fails():
+    assert check_rule(ADD_TO_CART_RULE, None) == (
+        "FAIL",
+        "The add_to_cart event wasn't sent",
+    )
+    assert check_rule(
+        ADD_TO_CART_RULE, [{"currency": "eur", "value": "9", "coupon": "10%"}]
+    ) == (
+        "FAIL",
+        "None of the 1 add_to_cart hit(s) is valid (missing parameters: items; invalid values of: currency, coupon)",
+    )